@@ -1,59 +1,180 @@
 import sys, os, random, pygame
-sys.path.append(os.path.join("objects"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "objects"))
 import SudokuSquare
 from utils import *
 from GameResources import *
 
 
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+BOARD_SIZE = 700, 700
+SQUARE_SIZE = 45, 40
+
+# the rendered square for each digit (None for an empty square), built once
+# per process by _square_tiles() so frames only blit the changed squares
+_tiles = {}
+
+
+def _square_position(x, y):
+    """Return the top left corner of the square in column x and row y of the board image"""
+    if x in (0, 1, 2):  startX = (x * 57) + 38
+    if x in (3, 4, 5):  startX = (x * 57) + 99
+    if x in (6, 7, 8):  startX = (x * 57) + 159
+
+    if y in (0, 1, 2):  startY = (y * 57) + 35
+    if y in (3, 4, 5):  startY = (y * 57) + 100
+    if y in (6, 7, 8):  startY = (y * 57) + 165
+    return startX, startY
+
+
+def _square_tiles():
+    if not _tiles:
+        pygame.font.init()
+        for number in [None] + list(range(1, 10)):
+            # draw a SudokuSquare at the origin of its own surface
+            tile = pygame.Surface(SQUARE_SIZE, pygame.SRCALPHA)
+            square = SudokuSquare.SudokuSquare(number, 0, 0, "N")
+            SudokuSquare.AAfilledRoundedRect(tile, (0, 0) + SQUARE_SIZE, square.color)
+            tile.blit(square.text, square.textpos)
+            _tiles[number] = tile
+    return _tiles
+
+
+def _draw_square(frame, box, value):
+    y, x = rows.index(box[0]), cols.index(box[1])
+    number = int(value) if len(value) == 1 and value != '.' else None
+    frame.blit(_square_tiles()[number], _square_position(x, y))
+
+
+def render_frames(values, result, history):
+    """Yield a frame of the board for the start of the puzzle and after each assignment
+
+    The board is drawn once, and each later frame only redraws the square
+    that changed (with the cached tiles), so no display is needed.
+
+    Parameters
+    ----------
+    values(dict)
+        the starting puzzle, in the dictionary form of utils.grid2values()
+
+    result(dict)
+        the solved puzzle
+
+    history(History)
+        the assignments recorded by utils.assign_value() (see utils.reconstruct())
+
+    Yields
+    ------
+    pygame.Surface
+        the same surface, updated in place for every frame
+    """
+    frame = pygame.Surface(BOARD_SIZE)
+    frame.blit(pygame.image.load(os.path.join(IMAGE_DIR, "sudoku-board-bare.jpg")), (0, 0))
+    for box in boxes:
+        _draw_square(frame, box, values[box])
+    yield frame
+    for box, value in reconstruct(result, history):
+        _draw_square(frame, box, value)
+        yield frame
+
+
+def replay(values, result, history, output, fps=5, every=1):
+    """Render the assignments of a solve to PNG frames or a GIF without a display
+
+    Parameters
+    ----------
+    values(dict)
+        the starting puzzle, in the dictionary form of utils.grid2values()
+
+    result(dict)
+        the solved puzzle
+
+    history(History)
+        the assignments recorded by utils.assign_value() (see utils.reconstruct())
+
+    output(string)
+        a file name ending in ".gif" (requires the Pillow package), or a
+        directory where the frames are saved as numbered PNG files
+
+    fps(int)
+        the frame rate of the GIF
+
+    every(int)
+        keep only every `every`-th frame (the final frame is always kept)
+
+    Returns
+    -------
+    int
+        the number of frames written
+    """
+    # render without a window server (e.g., in CI)
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    gif = output.lower().endswith(".gif")
+    if gif:
+        from PIL import Image  # optional, only needed for GIF output
+        images = []
+    else:
+        os.makedirs(output, exist_ok=True)
+
+    def save(frame, index):
+        if gif:
+            image = Image.frombytes("RGB", BOARD_SIZE, pygame.image.tostring(frame, "RGB"))
+            # every frame has the colors of the first one, so quantizing them
+            # all to its palette is much faster (and smaller) than per frame
+            palette = images[0] if images else image.quantize(colors=64)
+            images.append(image.quantize(palette=palette, dither=Image.Dither.NONE))
+        else:
+            pygame.image.save(frame, os.path.join(output, "frame{:05d}.png".format(index)))
+
+    count = 0
+    skipped = False
+    for i, frame in enumerate(render_frames(values, result, history)):
+        skipped = i % every != 0
+        if not skipped:
+            save(frame, count)
+            count += 1
+    if skipped:  # always end on the solved board
+        save(frame, count)
+        count += 1
+    if gif:
+        images[0].save(output, save_all=True, append_images=images[1:], duration=1000 // fps, loop=0)
+    return count
+
+
 def play(values, result, history):
-    assignments = reconstruct(result, history)
     pygame.init()
 
-    size = width, height = 700, 700
+    size = width, height = BOARD_SIZE
     screen = pygame.display.set_mode(size)
 
-    background_image = pygame.image.load("./images/sudoku-board-bare.jpg").convert()
-
     clock = pygame.time.Clock()
 
-    while True:
+    for frame in render_frames(values, result, history):
         pygame.event.pump()
-        theSquares = []
-        initXLoc = 0
-        initYLoc = 0
-        startX, startY, editable, number = 0, 0, "N", 0
-        for y in range(9):
-            for x in range(9):
-                if x in (0, 1, 2):  startX = (x * 57) + 38
-                if x in (3, 4, 5):  startX = (x * 57) + 99
-                if x in (6, 7, 8):  startX = (x * 57) + 159
-
-                if y in (0, 1, 2):  startY = (y * 57) + 35
-                if y in (3, 4, 5):  startY = (y * 57) + 100
-                if y in (6, 7, 8):  startY = (y * 57) + 165
-                string_number = values[rows[y] + cols[x]]
-                if len(string_number) > 1 or string_number == '' or string_number == '.':
-                    number = None
-                else:
-                    number = int(string_number)
-                theSquares.append(SudokuSquare.SudokuSquare(number, startX, startY, editable, x, y))
-
-        screen.blit(background_image, (0, 0))
-        for num in theSquares:
-            num.draw()
-
+        screen.blit(frame, (0, 0))
         pygame.display.flip()
         pygame.display.update()
         clock.tick(5)
 
-        if len(assignments) == 0:
-            break
-        box, value = assignments.pop()
-        values[box] = value
-
     # leave game showing until closed by user
     while True:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 quit()
+
+
+if __name__ == "__main__":
+    import argparse
+    import solution
+
+    parser = argparse.ArgumentParser(description="Render the replay of a solve without a display")
+    parser.add_argument("output", help="a .gif file name, or a directory for PNG frames")
+    parser.add_argument("--grid", default='2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3',
+                        help="the diagonal sudoku grid to solve")
+    parser.add_argument("--fps", type=int, default=5, help="frame rate of the GIF")
+    parser.add_argument("--every", type=int, default=1, help="keep only every n-th frame")
+    args = parser.parse_args()
+
+    set_history_mode('solve')
+    result = solution.solve(args.grid, engine="dict")
+    print(replay(grid2values(args.grid), result, history, args.output, args.fps, args.every), "frames")
@@ -0,0 +1,133 @@
+"""Solve large numbers of Sudoku puzzles across a pool of worker processes
+
+Puzzles are read lazily from any iterable of grid strings (or from a text or
+packed puzzle file, see puzzle_io.py) and sent to the workers in chunks. Only
+a bounded number of chunks is in flight at a time, so the input is never held
+in memory at once.
+
+Examples
+--------
+>>> from batch import solve_many
+>>> for result in solve_many("puzzles.txt", workers=4):
+...     display(result)
+>>> solve_file("puzzles.bin", "solutions.txt", workers=4)
+"""
+import os
+
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+from queue import Queue
+
+import utils
+import solution
+
+from puzzle_io import read_puzzles, write_solutions
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _solve_chunk(chunk, engine, diagonal):
+    """Solve a list of (index, grid) pairs inside a worker process"""
+    return [(index, solution.solve(grid, engine=engine, diagonal=diagonal)) for index, grid in chunk]
+
+
+def solve_many(grids, workers=None, chunksize=64, ordered=True, engine="bitmask", diagonal=None):
+    """Solve every puzzle in `grids` using a pool of worker processes
+
+    Parameters
+    ----------
+    grids(iterable or string)
+        an iterable of grid strings, or the name of a text or packed puzzle
+        file (see puzzle_io.read_puzzles())
+
+    workers(int)
+        the number of worker processes (defaults to os.cpu_count())
+
+    chunksize(int)
+        the number of puzzles sent to a worker in each task
+
+    ordered(bool)
+        if True, yield results in the same order as the input; otherwise
+        yield (index, result) pairs as soon as each chunk is completed
+
+    engine(string)
+        the solver engine passed to solution.solve()
+
+    diagonal(bool)
+        whether the main diagonals are units (see solution.solve()); by
+        default 9x9 puzzles are diagonal, so pass False for standard puzzles
+
+    Yields
+    ------
+    dict or False, or (int, dict or False)
+        The solution for each puzzle (see solution.solve()); paired with the
+        position of the puzzle in the input when ordered is False
+    """
+    if isinstance(grids, str):
+        grids = read_puzzles(grids)
+    workers = workers or os.cpu_count() or 1
+    max_pending = 2 * workers  # enough chunks to keep every worker busy
+    chunks = _chunked(enumerate(grids), chunksize)
+    # the assignment history is only useful for visualizing a single solve, so
+    # make sure workers don't inherit a recording mode from the parent process
+    with Pool(workers, initializer=utils.set_history_mode, initargs=('off',)) as pool:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_solve_chunk, (chunk, engine, diagonal)))
+                if len(pending) >= max_pending:
+                    for _, result in pending.popleft().get():
+                        yield result
+            while pending:
+                for _, result in pending.popleft().get():
+                    yield result
+        else:
+            completed = Queue()
+            pending = 0
+            for chunk in chunks:
+                pool.apply_async(_solve_chunk, (chunk, engine, diagonal),
+                                 callback=completed.put, error_callback=completed.put)
+                pending += 1
+                if pending >= max_pending:
+                    yield from _completed_results(completed.get())
+                    pending -= 1
+            while pending:
+                yield from _completed_results(completed.get())
+                pending -= 1
+
+
+def solve_file(source, destination, **options):
+    """Solve every puzzle of a file and stream the solutions to another file
+
+    Parameters
+    ----------
+    source(string)
+        the name of a text or packed puzzle file (see puzzle_io.py)
+
+    destination(string or file)
+        the text file written by puzzle_io.write_solutions(), with the solution
+        of each puzzle on the same line as the puzzle in the input
+
+    options
+        keyword arguments passed to solve_many() (e.g., workers=4, or
+        diagonal=False for standard puzzles)
+
+    Returns
+    -------
+    int
+        the number of puzzles solved
+    """
+    return write_solutions(destination, solve_many(source, ordered=True, **options))
+
+
+def _completed_results(results):
+    if isinstance(results, BaseException):
+        raise results
+    return results
@@ -0,0 +1,135 @@
+"""Benchmark the Sudoku solver engines on the bundled puzzle sets
+
+Each engine solves every puzzle in each set (see the puzzles/ directory) and
+the harness reports the throughput, the median and 99th percentile latency,
+the number of search nodes expanded, and the peak memory allocated while
+solving. Results can also be written as JSON to compare engines or track
+regressions between commits.
+
+Examples
+--------
+    $ python benchmark.py
+    $ python benchmark.py --engines bitmask dlx --sets hard 17-clue --repeat 3 --json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import solution
+
+from puzzle_io import read_grids
+from stats import SolveStats
+
+
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzles")
+
+# name -> (file in PUZZLE_DIR, whether the diagonals are units)
+PUZZLE_SETS = {
+    "easy": ("easy.txt", False),
+    "hard": ("hard.txt", False),
+    "17-clue": ("seventeen.txt", False),
+    "diagonal": ("diagonal.txt", True),
+}
+
+ENGINES = ("bitmask", "dlx", "dict")
+
+
+def percentile(samples, q):
+    """Return the q-th percentile (0 <= q <= 100) of the samples by nearest rank"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def run_benchmark(engine, grids, diagonal, repeat=1):
+    """Solve each grid `repeat` times with the engine and summarize the results
+
+    Parameters
+    ----------
+    engine(string)
+        the solver engine passed to solution.solve()
+
+    grids(list)
+        a list of strings representing sudoku grids
+
+    diagonal(bool)
+        whether the main diagonals are units
+
+    repeat(int)
+        the number of times each puzzle is solved for the timing
+
+    Returns
+    -------
+    dict
+        the number of puzzles and of unsolved puzzles, puzzles per second,
+        p50/p99 latency in milliseconds, the total search nodes, guesses and
+        backtracks, and the peak traced memory in bytes
+    """
+    latencies = []
+    unsolved = 0
+    for _ in range(repeat):
+        for grid in grids:
+            start = time.perf_counter()
+            result = solution.solve(grid, engine=engine, diagonal=diagonal)
+            latencies.append(time.perf_counter() - start)
+            unsolved += not result
+
+    # tracing allocations and counting slow the solver down, so measure
+    # memory and search statistics in a separate pass
+    stats = SolveStats()
+    tracemalloc.start()
+    try:
+        for grid in grids:
+            solution.solve(grid, engine=engine, diagonal=diagonal, stats=stats)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        "puzzles": len(grids),
+        "unsolved": unsolved // repeat,
+        "puzzles_per_sec": len(latencies) / total if total else None,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p99_ms": 1000 * percentile(latencies, 99),
+        "nodes": stats.nodes,
+        "guesses": stats.guesses,
+        "backtracks": stats.backtracks,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def main(args):
+    results = []
+    print("{:<8} {:<9} {:>8} {:>12} {:>9} {:>9} {:>8} {:>12}".format(
+        "engine", "set", "puzzles", "puzzles/sec", "p50 ms", "p99 ms", "nodes", "peak bytes"))
+    for engine in args.engines:
+        for name in args.sets:
+            filename, diagonal = PUZZLE_SETS[name]
+            grids = list(read_grids(os.path.join(PUZZLE_DIR, filename)))
+            if engine == "dict" and not diagonal:
+                continue  # the dict engine only solves diagonal puzzles
+            result = run_benchmark(engine, grids, diagonal, args.repeat)
+            result.update(engine=engine, set=name)
+            results.append(result)
+            print("{engine:<8} {set:<9} {puzzles:>8} {puzzles_per_sec:>12.1f} {p50_ms:>9.3f} "
+                  "{p99_ms:>9.3f} {nodes:>8} {peak_memory_bytes:>12}".format(**result))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "repeat": args.repeat, "results": results},
+                      f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Sudoku solver engines")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["bitmask", "dlx"],
+                        help="solver engines to benchmark")
+    parser.add_argument("--sets", nargs="+", choices=list(PUZZLE_SETS), default=list(PUZZLE_SETS),
+                        help="puzzle sets to solve")
+    parser.add_argument("--repeat", type=int, default=1, help="number of timed passes over each set")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    main(parser.parse_args())
@@ -0,0 +1,646 @@
+"""Bitmask board representation for the Sudoku solver
+
+The dictionary representation in utils.py stores the candidates for each box
+as a string (e.g., {'A1': '123456789', ...}). This module stores the same
+information as a flat list of integers in `boxes` order, where bit k of each
+entry is set if the k-th digit symbol is still a candidate for that box. Units
+and peers are precomputed as tuples of list indices, so the strategies below
+only use integer indexing and bitwise operations. The same code solves larger
+boards (see utils.make_board() and board_tables()).
+
+Examples
+--------
+>>> from solution import unitlist
+>>> tables = build_tables(unitlist, boxes)
+>>> bits = search(grid2bits(grid, tables), tables)
+>>> values = bits2values(bits, tables)
+"""
+import time
+
+from collections import deque, namedtuple
+from functools import lru_cache
+
+import tablecache
+
+from utils import boxes, cols, make_board
+
+
+Tables = namedtuple("Tables", "boxes index units box_units peers digits full popcount")
+
+# lookup tables indexed by candidate mask are only built for boards up to 16x16
+MAX_LOOKUP_DIGITS = 16
+
+
+class _PopCount:
+    """Stand-in for a popcount lookup table on boards too large to tabulate"""
+    def __getitem__(self, mask):
+        return bin(mask).count('1')
+
+
+@lru_cache(maxsize=None)
+def _popcount_table(n_digits):
+    if n_digits > MAX_LOOKUP_DIGITS:
+        return _PopCount()
+    # the masks with bit k set have one more candidate than the masks below them
+    table = [0]
+    for _ in range(n_digits):
+        table += [count + 1 for count in table]
+    return table
+
+
+POPCOUNT = _popcount_table(len(cols))
+MASK2DIGITS = [''.join(d for i, d in enumerate(cols) if mask & (1 << i)) for mask in range(1 << len(cols))]
+
+# the largest naked subset looked for by naked_subsets() and propagate();
+# larger subsets are rare and indexing their masks slows down propagation
+MAX_NAKED_SUBSET = 4
+
+
+def mask2digits(mask, digits=cols):
+    """Return the digit symbols of the candidates in a mask (e.g., 0b101 -> '13')"""
+    if digits == cols:
+        return MASK2DIGITS[mask]
+    return ''.join(d for i, d in enumerate(digits) if mask & (1 << i))
+
+
+def build_tables(unitlist, boxes=boxes, digits=cols):
+    """Precompute index arrays for the units and peers of each box
+
+    Parameters
+    ----------
+    unitlist(list)
+        a list containing "units" (rows, columns, diagonals, etc.) of boxes
+
+    boxes(list)
+        a list of strings identifying each box on a sudoku board (e.g., "A1", "C7", etc.)
+
+    digits(string)
+        the symbols that can be placed in each box
+
+    Returns
+    -------
+    Tables
+        a namedtuple with the box names, a mapping from box name to index, the
+        units as tuples of box indices, the indices of the units each box belongs
+        to, the (sorted) peer indices of each box, the digit symbols, the mask
+        with every candidate bit set, and a popcount lookup table for masks
+
+    Notes
+    -----
+    The index arrays are loaded from the on-disk cache of tablecache.py
+    """
+    cached = tablecache.load_tables(unitlist, boxes, digits)
+    index = {box: i for i, box in enumerate(boxes)}
+    return Tables(tuple(boxes), index, cached.unit_index, cached.box_units, cached.peer_index,
+                  digits, (1 << len(digits)) - 1, _popcount_table(len(digits)))
+
+
+@lru_cache(maxsize=None)
+def board_tables(n, diagonal=False):
+    """Build (and cache) the Tables of the (n^2 x n^2) board from utils.make_board()"""
+    board = make_board(n, diagonal)
+    return build_tables(board.unitlist, board.boxes, board.digits)
+
+
+def values2bits(values, tables):
+    """Convert the dictionary board representation to a list of candidate masks
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    tables(Tables)
+        the index tables returned by build_tables()
+
+    Returns
+    -------
+    list
+        a list of integer candidate masks in `tables.boxes` order
+    """
+    digits = tables.digits
+    bits = []
+    for box in tables.boxes:
+        mask = 0
+        for digit in values[box]:
+            mask |= 1 << digits.index(digit)
+        bits.append(mask)
+    return bits
+
+
+def bits2values(bits, tables):
+    """Convert a list of candidate masks to the dictionary board representation
+
+    This is the inverse of values2bits(); a box with no candidates maps to ''.
+
+    Parameters
+    ----------
+    bits(list)
+        a list of integer candidate masks in `tables.boxes` order
+
+    tables(Tables)
+        the index tables returned by build_tables()
+
+    Returns
+    -------
+    dict
+        a dictionary of the form {'box_name': '123456789', ...}
+    """
+    return {box: mask2digits(mask, tables.digits) for box, mask in zip(tables.boxes, bits)}
+
+
+def grid2bits(grid, tables):
+    """Convert a grid string into a list of candidate masks (all candidates for '.')
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+        Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    tables(Tables)
+        the index tables returned by build_tables()
+
+    Returns
+    -------
+    list
+        a list of integer candidate masks in `tables.boxes` order
+    """
+    digits, full = tables.digits, tables.full
+    return [full if val == '.' else 1 << digits.index(val) for val in grid]
+
+
+def bits2grid(bits, tables=None):
+    """Convert a list of candidate masks to a grid string ('.' for unsolved boxes)"""
+    digits = cols if tables is None else tables.digits
+    return ''.join(mask2digits(mask, digits) if mask and not mask & (mask - 1) else '.' for mask in bits)
+
+
+def eliminate(bits, tables):
+    """Remove the digit of every solved box from the candidates of its peers
+
+    See Also
+    --------
+    solution.eliminate()
+    """
+    peers = tables.peers
+    for i, mask in enumerate(bits):
+        if mask and not mask & (mask - 1):
+            keep = ~mask
+            for p in peers[i]:
+                bits[p] &= keep
+    return bits
+
+
+def only_choice(bits, tables):
+    """Assign every digit that fits in only one box of a unit to that box
+
+    Returns False if some digit cannot be placed anywhere in a unit, or if two
+    digits can only be placed in the same box.
+
+    See Also
+    --------
+    solution.only_choice()
+    """
+    for unit in tables.units:
+        once = twice = 0
+        for i in unit:
+            mask = bits[i]
+            twice |= once & mask
+            once |= mask
+        if once != tables.full:
+            return False
+        once &= ~twice
+        if once:
+            for i in unit:
+                mask = bits[i] & once
+                if mask:
+                    if mask & (mask - 1):
+                        return False
+                    bits[i] = mask
+    return bits
+
+
+def naked_subsets(bits, tables):
+    """Remove the digits of every naked subset from the rest of its unit
+
+    A naked subset is a group of k boxes of a unit with the same k candidates
+    (naked twins, triples and quads, up to MAX_NAKED_SUBSET). Each unit is
+    indexed by candidate mask, so this is linear in the size of the unit.
+    Returns False if more than k boxes of a unit share the same k candidates.
+
+    See Also
+    --------
+    solution.naked_subsets()
+    """
+    popcount = tables.popcount
+    for unit in tables.units:
+        subsets = _unit_subsets(bits, unit, popcount)
+        if subsets is False:
+            return False
+        for subset in subsets:
+            keep = ~subset
+            for i in unit:
+                if bits[i] != subset:
+                    bits[i] &= keep
+    return bits
+
+
+def _unit_subsets(bits, unit, popcount):
+    """Return the naked subset masks of a unit, or False if one has too many boxes"""
+    index = {}
+    for i in unit:
+        mask = bits[i]
+        if 1 < popcount[mask] <= MAX_NAKED_SUBSET:
+            index[mask] = index.get(mask, 0) + 1
+    subsets = []
+    for mask, count in index.items():
+        if count >= popcount[mask]:
+            if count > popcount[mask]:
+                return False
+            subsets.append(mask)
+    return subsets
+
+
+def reduce_puzzle(bits, tables):
+    """Repeatedly apply the constraint strategies until the board stops changing
+
+    Returns
+    -------
+    list or False
+        The candidate masks after reaching a fixed point, or False if the
+        puzzle is unsolvable
+
+    See Also
+    --------
+    solution.reduce_puzzle()
+    """
+    while True:
+        before = bits[:]
+        if not (eliminate(bits, tables) and only_choice(bits, tables) and naked_subsets(bits, tables)):
+            return False
+        if 0 in bits:
+            return False
+        if bits == before:
+            return bits
+
+
+def propagate(bits, tables, changed=None, trail=None, stats=None):
+    """Apply the constraint strategies incrementally until the board stops changing
+
+    reduce_puzzle() sweeps every box and unit until nothing changes, even when
+    only a single box was modified. This function reaches the same fixed point
+    using two work queues: boxes that became solved (whose digit must be
+    eliminated from their peers), and units that contain a changed box (which
+    must be checked again for only choice and naked subsets).
+
+    Parameters
+    ----------
+    bits(list)
+        a list of integer candidate masks in `tables.boxes` order; the list
+        is modified in place
+
+    tables(Tables)
+        the index tables returned by build_tables()
+
+    changed(iterable)
+        the indices of the boxes that changed since the board was last at a
+        fixed point (defaults to every box)
+
+    trail(list)
+        if given, an (index, previous mask) pair is appended for every box
+        that is modified, so the changes can be rolled back with undo() (even
+        if propagation fails part way through)
+
+    stats(SolveStats)
+        if given, the call, the time spent, and the number of applications and
+        changes of each strategy are added to this object (see stats.py)
+
+    Returns
+    -------
+    list or False
+        The candidate masks after reaching a fixed point, or False if the
+        puzzle is unsolvable
+    """
+    if stats is None:
+        return _propagate(bits, tables, changed, trail, None)
+    counts = {}
+    start = time.perf_counter()
+    try:
+        return _propagate(bits, tables, changed, trail, counts)
+    finally:
+        stats.strategy_time["propagate"] += time.perf_counter() - start
+        stats.propagation_rounds += 1
+        for key, count in counts.items():
+            (stats.strategy_calls if key[1] == "calls" else stats.strategy_changes)[key[0]] += count
+
+
+def _propagate(bits, tables, changed, trail, counts):
+    """See propagate(); counts maps (strategy, "calls" or "changes") to a count"""
+    peers, units, box_units, full = tables.peers, tables.units, tables.box_units, tables.full
+    popcount = tables.popcount
+    solved = []
+    dirty_units = deque()
+    is_dirty = [False] * len(units)
+
+    def update(i, mask):
+        if trail is not None:
+            trail.append((i, bits[i]))
+        bits[i] = mask
+        mark(i, mask)
+
+    def mark(i, mask):
+        if not mask & (mask - 1):
+            solved.append(i)
+        for u in box_units[i]:
+            if not is_dirty[u]:
+                is_dirty[u] = True
+                dirty_units.append(u)
+
+    for i in (range(len(bits)) if changed is None else changed):
+        if not bits[i]:
+            return False
+        mark(i, bits[i])
+
+    while solved or dirty_units:
+        # eliminate first; it is the cheapest strategy and the only one that
+        # can be applied to a single box
+        while solved:
+            i = solved.pop()
+            digit = bits[i]
+            keep = ~digit
+            if counts is not None:
+                _count(counts, ("eliminate", "calls"))
+            for p in peers[i]:
+                mask = bits[p]
+                if mask & digit:
+                    mask &= keep
+                    if not mask:
+                        return False
+                    update(p, mask)
+                    if counts is not None:
+                        _count(counts, ("eliminate", "changes"))
+        if not dirty_units:
+            break
+        u = dirty_units.popleft()
+        is_dirty[u] = False
+        unit = units[u]
+        if counts is not None:
+            _count(counts, ("only_choice", "calls"))
+            _count(counts, ("naked_subsets", "calls"))
+
+        # only choice
+        once = twice = 0
+        for i in unit:
+            mask = bits[i]
+            twice |= once & mask
+            once |= mask
+        if once != full:
+            return False
+        once &= ~twice
+        if once:
+            for i in unit:
+                mask = bits[i] & once
+                if mask and mask != bits[i]:
+                    if mask & (mask - 1):
+                        return False
+                    update(i, mask)
+                    if counts is not None:
+                        _count(counts, ("only_choice", "changes"))
+
+        # naked subsets
+        subsets = _unit_subsets(bits, unit, popcount)
+        if subsets is False:
+            return False
+        for subset in subsets:
+            for i in unit:
+                mask = bits[i]
+                if mask != subset and mask & subset:
+                    mask &= ~subset
+                    if not mask:
+                        return False
+                    update(i, mask)
+                    if counts is not None:
+                        _count(counts, ("naked_subsets", "changes"))
+    return bits
+
+
+def _count(counts, key):
+    counts[key] = counts.get(key, 0) + 1
+
+
+def undo(bits, trail, mark):
+    """Roll back the changes recorded on the trail after position `mark`"""
+    while len(trail) > mark:
+        i, mask = trail.pop()
+        bits[i] = mask
+
+
+def search(bits, tables, backtrack="trail", branching="scan", tie_break=None, stats=None):
+    """Depth first search with constraint propagation over candidate masks
+
+    Each branch only propagates the consequences of the box it assigned.
+
+    Parameters
+    ----------
+    bits(list)
+        a list of integer candidate masks in `tables.boxes` order; the list
+        is modified in place
+
+    tables(Tables)
+        the index tables returned by build_tables()
+
+    backtrack(string)
+        "trail" (default) searches on a single board, recording every change
+        on an undo trail that is rolled back when a branch fails; "copy"
+        gives each branch its own copy of the board
+
+    branching(string)
+        how the search picks the box with the fewest candidates: "scan"
+        (default) checks every box at each node; "buckets" maintains a
+        BucketIndex of the unsolved boxes by candidate count (requires
+        backtrack="trail")
+
+    tie_break(string)
+        None (default) takes any box with the fewest candidates; "degree"
+        prefers the one with the most unsolved peers (requires
+        branching="buckets")
+
+    stats(SolveStats)
+        if given, the search nodes, guesses and backtracks (and the counters
+        of propagate()) are added to this object (see stats.py)
+
+    Returns
+    -------
+    list or False
+        The candidate masks with every box assigned, or False
+
+    See Also
+    --------
+    solution.search()
+    """
+    bits = propagate(bits, tables, stats=stats)
+    if bits is False:
+        return False
+    if branching not in ("scan", "buckets"):
+        raise ValueError("Unknown branching mode: {!r}".format(branching))
+    if tie_break not in (None, "degree") or (tie_break and branching != "buckets"):
+        raise ValueError("Unsupported tie break: {!r}".format(tie_break))
+    if branching == "buckets":
+        if backtrack != "trail":
+            raise ValueError("Bucket branching requires backtrack='trail'")
+        index = BucketIndex(bits, tables, tie_break)
+        return bits if _search_buckets(bits, tables, [], index, stats) else False
+    if backtrack == "trail":
+        return bits if _search_trail(bits, tables, [], stats) else False
+    if backtrack == "copy":
+        return _search(bits, tables, stats)
+    raise ValueError("Unknown backtrack mode: {!r}".format(backtrack))
+
+
+class BucketIndex:
+    """The unsolved boxes of a board grouped by their number of candidates
+
+    The search picks its branching box from the first non-empty bucket instead
+    of scanning the whole board at every node. The index is updated with the
+    boxes recorded on the undo trail, both after propagation and after undo.
+
+    Parameters
+    ----------
+    bits(list)
+        a list of integer candidate masks in `tables.boxes` order
+
+    tables(Tables)
+        the index tables returned by build_tables()
+
+    tie_break(string)
+        None to pick any box from the smallest bucket, or "degree" to pick the
+        box in the smallest bucket with the most unsolved peers (the number of
+        unsolved peers of every box is then also maintained)
+    """
+    def __init__(self, bits, tables, tie_break=None):
+        self.popcount = popcount = tables.popcount
+        self.peers = tables.peers
+        self.count = [popcount[mask] for mask in bits]
+        self.buckets = [set() for _ in range(len(tables.digits) + 1)]
+        for i, count in enumerate(self.count):
+            if count > 1:
+                self.buckets[count].add(i)
+        self.degree = None
+        if tie_break == "degree":
+            self.degree = [sum(self.count[p] > 1 for p in box_peers) for box_peers in self.peers]
+
+    def update(self, bits, indices):
+        """Move the boxes at the given indices to the buckets of their current masks"""
+        popcount, count, buckets, degree = self.popcount, self.count, self.buckets, self.degree
+        for i in indices:
+            new, old = popcount[bits[i]], count[i]
+            if new == old:
+                continue
+            if old > 1:
+                buckets[old].discard(i)
+            if new > 1:
+                buckets[new].add(i)
+            count[i] = new
+            if degree is not None and (old > 1) != (new > 1):
+                delta = 1 if new > 1 else -1
+                for p in self.peers[i]:
+                    degree[p] += delta
+
+    def select(self):
+        """Return an unsolved box with the fewest candidates, or None if all are solved"""
+        for bucket in self.buckets[2:]:
+            if bucket:
+                if self.degree is None:
+                    return next(iter(bucket))
+                return max(bucket, key=self.degree.__getitem__)
+        return None
+
+
+def _branch_box(bits, tables):
+    """Choose one of the unfilled boxes with the fewest possibilities"""
+    popcount = tables.popcount
+    best, fewest = None, len(tables.digits) + 1
+    for i, mask in enumerate(bits):
+        count = popcount[mask]
+        if 1 < count < fewest:
+            best, fewest = i, count
+            if count == 2:
+                break
+    return best
+
+
+def _search(bits, tables, stats):
+    if stats is not None:
+        stats.nodes += 1
+    best = _branch_box(bits, tables)
+    if best is None:
+        return bits
+    mask = bits[best]
+    while mask:
+        digit = mask & -mask
+        mask ^= digit
+        if stats is not None:
+            stats.guesses += 1
+        attempt = bits[:]
+        attempt[best] = digit
+        if propagate(attempt, tables, (best,), stats=stats):
+            attempt = _search(attempt, tables, stats)
+            if attempt:
+                return attempt
+        if stats is not None:
+            stats.backtracks += 1
+    return False
+
+
+def _search_trail(bits, tables, trail, stats):
+    if stats is not None:
+        stats.nodes += 1
+    best = _branch_box(bits, tables)
+    if best is None:
+        return True
+    mask = bits[best]
+    while mask:
+        digit = mask & -mask
+        mask ^= digit
+        if stats is not None:
+            stats.guesses += 1
+        mark = len(trail)
+        trail.append((best, bits[best]))
+        bits[best] = digit
+        if propagate(bits, tables, (best,), trail, stats) and _search_trail(bits, tables, trail, stats):
+            return True
+        undo(bits, trail, mark)
+        if stats is not None:
+            stats.backtracks += 1
+    return False
+
+
+def _search_buckets(bits, tables, trail, index, stats):
+    if stats is not None:
+        stats.nodes += 1
+    best = index.select()
+    if best is None:
+        return True
+    mask = bits[best]
+    while mask:
+        digit = mask & -mask
+        mask ^= digit
+        if stats is not None:
+            stats.guesses += 1
+        mark = len(trail)
+        trail.append((best, bits[best]))
+        bits[best] = digit
+        consistent = propagate(bits, tables, (best,), trail, stats)
+        if consistent:
+            changed = [i for i, _ in trail[mark:]]
+            index.update(bits, changed)
+            if _search_buckets(bits, tables, trail, index, stats):
+                return True
+        undo(bits, trail, mark)
+        if consistent:
+            index.update(bits, changed)
+        if stats is not None:
+            stats.backtracks += 1
+    return False
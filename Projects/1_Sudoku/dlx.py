@@ -0,0 +1,262 @@
+"""Exact cover (Algorithm X with dancing links) backend for the Sudoku solver
+
+A Sudoku puzzle is an exact cover problem: every box must hold exactly one
+digit, and every unit must contain every digit exactly once. Each candidate
+placement (box, digit) is a row of the cover matrix that covers the column of
+its box and the (unit, digit) column of every unit containing the box. The
+columns are derived from the unit list, so the same code handles standard and
+diagonal Sudoku.
+
+The matrix is built once per unit list as a set of parallel arrays (Knuth's
+"dancing links"), and the givens of each puzzle are covered before the search
+and uncovered afterwards, so the search never copies the board. This makes it
+cheap to count every solution of a puzzle (e.g., to check uniqueness).
+
+Examples
+--------
+>>> from solution import unitlist
+>>> exact_cover = ExactCover(unitlist)
+>>> exact_cover.count(grid, limit=2)
+1
+"""
+from functools import lru_cache
+
+from utils import boxes, cols, make_board
+
+
+class ExactCover:
+    """Dancing links cover matrix for a Sudoku board with the given units
+
+    Parameters
+    ----------
+    unitlist(list)
+        a list containing "units" (rows, columns, diagonals, etc.) of boxes
+
+    boxes(list)
+        a list of strings identifying each box on a sudoku board (e.g., "A1", "C7", etc.)
+
+    digits(string)
+        the symbols that can be placed in each box
+    """
+    def __init__(self, unitlist, boxes=boxes, digits=cols):
+        self.boxes = list(boxes)
+        self.digits = digits
+        n_digits = len(digits)
+        index = {box: i for i, box in enumerate(self.boxes)}
+        n_columns = len(self.boxes) + len(unitlist) * n_digits
+
+        # node 0 is the root, nodes 1..n_columns are the column headers
+        self.L = [i - 1 for i in range(n_columns + 1)]
+        self.R = [i + 1 for i in range(n_columns + 1)]
+        self.L[0], self.R[n_columns] = n_columns, 0
+        self.U = list(range(n_columns + 1))
+        self.D = list(range(n_columns + 1))
+        self.C = list(range(n_columns + 1))
+        self.S = [0] * (n_columns + 1)
+        self.row_of = [None] * (n_columns + 1)  # (box index, digit index) of each node
+
+        box_units = [[] for _ in self.boxes]
+        for u, unit in enumerate(unitlist):
+            for box in unit:
+                box_units[index[box]].append(u)
+
+        # first node of the row for each (box index, digit index) candidate
+        self.rows = []
+        for i, member_units in enumerate(box_units):
+            box_rows = []
+            for d in range(n_digits):
+                columns = [i + 1] + [len(self.boxes) + u * n_digits + d + 1 for u in member_units]
+                box_rows.append(self._add_row(columns, (i, d)))
+            self.rows.append(box_rows)
+
+    def _add_row(self, columns, row):
+        first = len(self.C)
+        for k, c in enumerate(columns):
+            x = first + k
+            self.C.append(c)
+            self.row_of.append(row)
+            self.U.append(self.U[c])
+            self.D.append(c)
+            self.D[self.U[c]] = x
+            self.U[c] = x
+            self.S[c] += 1
+            self.L.append(x - 1 if k else first + len(columns) - 1)
+            self.R.append(x + 1 if k < len(columns) - 1 else first)
+        return first
+
+    def _cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[c]] = L[c]
+        R[L[c]] = R[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[c]] = c
+        R[L[c]] = c
+
+    def _select(self, r):
+        j = r
+        while True:
+            self._cover(self.C[j])
+            j = self.R[j]
+            if j == r:
+                break
+
+    def _deselect(self, r):
+        j = self.L[r]
+        while True:
+            self._uncover(self.C[j])
+            if j == r:
+                break
+            j = self.L[j]
+
+    def _search(self, partial, solutions, limit, stats):
+        """Count the exact covers of the remaining columns (up to `limit` more)"""
+        R, D, S = self.R, self.D, self.S
+        if stats is not None:
+            stats.nodes += 1
+        c = R[0]
+        if c == 0:
+            if not solutions:
+                solutions.append(list(partial))
+            return 1
+        # branch on the column with the fewest remaining rows
+        best, fewest = c, S[c]
+        c = R[c]
+        while c != 0 and fewest > 1:
+            if S[c] < fewest:
+                best, fewest = c, S[c]
+            c = R[c]
+        if fewest == 0:
+            return 0
+        count = 0
+        self._cover(best)
+        r = D[best]
+        while r != best:
+            partial.append(r)
+            j = self.R[r]
+            while j != r:
+                self._cover(self.C[j])
+                j = self.R[j]
+            found = self._search(partial, solutions, limit and limit - count, stats)
+            if stats is not None:
+                stats.guesses += 1
+                stats.backtracks += not found
+            count += found
+            j = self.L[r]
+            while j != r:
+                self._uncover(self.C[j])
+                j = self.L[j]
+            partial.pop()
+            if limit and count >= limit:
+                break
+            r = D[r]
+        self._uncover(best)
+        return count
+
+    def _run(self, grid, limit, stats=None):
+        """Cover the givens of `grid`, search, then restore the matrix"""
+        selected = []
+        covered = set()
+        count = 0
+        solutions = []
+        try:
+            for i, val in enumerate(grid):
+                if val == '.':
+                    continue
+                r = self.rows[i][self.digits.index(val)]
+                # a given whose columns are already covered conflicts with another given
+                j = r
+                while True:
+                    if self.C[j] in covered:
+                        return 0, None
+                    j = self.R[j]
+                    if j == r:
+                        break
+                self._select(r)
+                selected.append(r)
+                j = r
+                while True:
+                    covered.add(self.C[j])
+                    j = self.R[j]
+                    if j == r:
+                        break
+            count = self._search(selected[:], solutions, limit, stats)
+        finally:
+            for r in reversed(selected):
+                self._deselect(r)
+        return count, (solutions[0] if solutions else None)
+
+    def count(self, grid, limit=None, stats=None):
+        """Count the solutions of a puzzle
+
+        Parameters
+        ----------
+        grid(string)
+            a string representing a sudoku grid.
+
+        limit(int)
+            stop counting after finding this many solutions (e.g., limit=2 is
+            enough to check whether a puzzle has a unique solution)
+
+        stats(SolveStats)
+            if given, the search nodes, guesses (rows tried) and backtracks
+            are added to this object (see stats.py)
+
+        Returns
+        -------
+        int
+            the number of solutions, or `limit` if there are at least that many
+        """
+        count, _ = self._run(grid, limit, stats)
+        return count
+
+    def solve(self, grid, stats=None):
+        """Find a solution of the puzzle
+
+        Parameters
+        ----------
+        grid(string)
+            a string representing a sudoku grid.
+
+        stats(SolveStats)
+            if given, the search counters are added to this object (see count())
+
+        Returns
+        -------
+        dict or False
+            The dictionary representation of the final sudoku grid or False if no solution exists.
+        """
+        _, nodes = self._run(grid, 1, stats)
+        if nodes is None:
+            return False
+        values = {}
+        for r in nodes:
+            i, d = self.row_of[r]
+            values[self.boxes[i]] = self.digits[d]
+        return values
+
+
+@lru_cache(maxsize=None)
+def board_exact_cover(n, diagonal=False):
+    """Build (and cache) the ExactCover of the (n^2 x n^2) board from utils.make_board()"""
+    board = make_board(n, diagonal)
+    return ExactCover(board.unitlist, board.boxes, board.digits)
@@ -0,0 +1,290 @@
+"""Generate Sudoku puzzles with a unique solution and grade their difficulty
+
+A puzzle is made by filling an empty board with a random solution, then
+removing clues in a random order as long as the puzzle keeps a unique
+solution (checked with solution.count_solutions()). The resulting puzzle is
+minimal: removing any other clue would allow more than one solution.
+
+Each puzzle is graded by the weakest technique that solves it:
+
+- "easy": eliminate and only choice alone
+- "medium": constraint propagation with naked subsets (bitboard.propagate())
+- "hard": search with at most HARD_GUESSES guesses
+- "expert": search with more guesses
+
+Puzzles can be generated in parallel over a pool of worker processes, with
+the same results for the same seed regardless of the number of workers.
+
+Examples
+--------
+>>> for grid, grade in generate(10, seed=0, workers=4, difficulty="hard"):
+...     print(grid, grade.guesses)
+
+    $ python generator.py --count 1000 --workers 8 --difficulty expert --output expert.txt
+"""
+import argparse
+import os
+import random
+import sys
+
+from collections import Counter, deque, namedtuple
+from itertools import count as counter
+from multiprocessing import Pool
+
+import bitboard
+import solution
+import utils
+
+from puzzle_io import write_grids
+from stats import SolveStats
+
+
+DIFFICULTIES = ("easy", "medium", "hard", "expert")
+
+# the most guesses the search can make on a "hard" puzzle
+HARD_GUESSES = 10
+
+Grade = namedtuple("Grade", "difficulty clues guesses backtracks strategy_changes")
+
+
+def random_solution(rng, tables):
+    """Return a random solved grid for the board of the given Tables
+
+    Parameters
+    ----------
+    rng(random.Random)
+        the random number generator
+
+    tables(Tables)
+        the index tables returned by bitboard.build_tables()
+
+    Returns
+    -------
+    string
+        the grid string of a random solution
+    """
+    popcount = tables.popcount
+    while True:
+        bits = [tables.full] * len(tables.boxes)
+        order = list(range(len(bits)))
+        rng.shuffle(order)
+        # assign a random candidate to each unsolved box, skipping the
+        # candidates that propagation shows are impossible
+        for i in order:
+            mask = bits[i]
+            if popcount[mask] == 1:
+                continue
+            candidates = [1 << k for k in range(len(tables.digits)) if mask >> k & 1]
+            trial = bits[:]
+            trial[i] = rng.choice(candidates)
+            if bitboard.propagate(trial, tables, (i,)):
+                bits = trial
+        bits = bitboard.search(bits, tables)
+        if bits:
+            return bitboard.bits2grid(bits, tables)
+
+
+def remove_clues(grid, rng, diagonal=None, symmetric=False):
+    """Remove clues from a grid in random order while the solution stays unique
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid with a unique solution (e.g., a
+        solved grid)
+
+    rng(random.Random)
+        the random number generator
+
+    diagonal(bool)
+        whether the main diagonals are units (see solution.solve())
+
+    symmetric(bool)
+        if True, clues are removed in pairs that are symmetric about the
+        center of the board
+
+    Returns
+    -------
+    string
+        a minimal puzzle (removing any remaining clue, or pair of clues, would
+        allow more than one solution)
+    """
+    cells = list(grid)
+    order = [i for i, val in enumerate(cells) if val != '.']
+    rng.shuffle(order)
+    for i in order:
+        removed = {i, len(cells) - 1 - i} if symmetric else {i}
+        if any(cells[j] == '.' for j in removed):
+            continue
+        saved = {j: cells[j] for j in removed}
+        for j in removed:
+            cells[j] = '.'
+        if solution.count_solutions(''.join(cells), limit=2, diagonal=diagonal) != 1:
+            for j, val in saved.items():
+                cells[j] = val
+    return ''.join(cells)
+
+
+def grade(grid, diagonal=None):
+    """Grade the difficulty of a puzzle by the techniques needed to solve it
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+    diagonal(bool)
+        whether the main diagonals are units (see solution.solve())
+
+    Returns
+    -------
+    Grade
+        a namedtuple with the difficulty (one of DIFFICULTIES), the number of
+        clues, the guesses and backtracks of the bitmask search, and the box
+        updates made by each propagation strategy (see stats.SolveStats)
+    """
+    board = utils.grid_board(grid)
+    tables = bitboard.board_tables(board.n, board.n == 3 if diagonal is None else diagonal)
+    stats = SolveStats()
+    bits = bitboard.search(bitboard.grid2bits(grid, tables), tables, stats=stats)
+    if not bits:
+        raise ValueError("The puzzle has no solution")
+    if stats.guesses > HARD_GUESSES:
+        difficulty = "expert"
+    elif stats.guesses:
+        difficulty = "hard"
+    elif _solved_by_singles(bitboard.grid2bits(grid, tables), tables):
+        difficulty = "easy"
+    else:
+        difficulty = "medium"
+    clues = sum(val != '.' for val in grid)
+    return Grade(difficulty, clues, stats.guesses, stats.backtracks, dict(stats.strategy_changes))
+
+
+def _solved_by_singles(bits, tables):
+    """Return True if eliminate and only choice alone solve the board"""
+    while True:
+        before = bits[:]
+        if not (bitboard.eliminate(bits, tables) and bitboard.only_choice(bits, tables)) or 0 in bits:
+            return False
+        if bits == before:
+            return all(tables.popcount[mask] == 1 for mask in bits)
+
+
+def generate_one(seed, n=3, diagonal=False, symmetric=False):
+    """Generate and grade a single puzzle from a seed
+
+    Returns
+    -------
+    tuple
+        the (grid, Grade) of the puzzle
+    """
+    rng = random.Random(seed)
+    tables = bitboard.board_tables(n, diagonal)
+    grid = remove_clues(random_solution(rng, tables), rng, diagonal, symmetric)
+    return grid, grade(grid, diagonal)
+
+
+def _generate_chunk(seeds, n, diagonal, symmetric):
+    return [generate_one(seed, n, diagonal, symmetric) for seed in seeds]
+
+
+def generate(count, n=3, diagonal=False, symmetric=False, difficulty=None, seed=None,
+             workers=1, chunksize=4):
+    """Generate graded puzzles with a unique solution
+
+    Parameters
+    ----------
+    count(int)
+        the number of puzzles to generate
+
+    n(int)
+        the size of the square units (see utils.make_board())
+
+    diagonal(bool)
+        whether the main diagonals are units
+
+    symmetric(bool)
+        whether the clues are symmetric about the center of the board
+
+    difficulty(string)
+        if given, only puzzles of this difficulty (one of DIFFICULTIES) are
+        kept, and puzzles are generated until there are `count` of them
+
+    seed(int or string)
+        the seed of the random puzzles; the same seed gives the same puzzles
+        for any number of workers
+
+    workers(int)
+        the number of worker processes (None for os.cpu_count()); with 1 the
+        puzzles are generated in this process
+
+    chunksize(int)
+        the number of puzzles generated by a worker in each task
+
+    Yields
+    ------
+    tuple
+        the (grid, Grade) of each puzzle
+    """
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError("Unknown difficulty: {!r}".format(difficulty))
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    seeds = ("{}-{}".format(seed, i) for i in counter())
+    chunks = ([next(seeds) for _ in range(chunksize)] for _ in counter())
+    args = (n, diagonal, symmetric)
+
+    if workers == 1:
+        results = (puzzle for chunk in chunks for puzzle in _generate_chunk(chunk, *args))
+    else:
+        results = _generate_parallel(chunks, args, workers)
+    found = 0
+    for grid, puzzle_grade in results:
+        if difficulty is None or puzzle_grade.difficulty == difficulty:
+            yield grid, puzzle_grade
+            found += 1
+            if found == count:
+                return
+
+
+def _generate_parallel(chunks, args, workers):
+    """Yield the puzzles of the (endless) chunks of seeds in order from a pool of workers"""
+    workers = workers or os.cpu_count() or 1
+    with Pool(workers, initializer=utils.set_history_mode, initargs=('off',)) as pool:
+        # keep enough chunks in flight to keep every worker busy, but no more
+        # (the chunks never run out, and the caller stops when it has enough)
+        pending = deque(pool.apply_async(_generate_chunk, (next(chunks),) + args)
+                        for _ in range(2 * workers))
+        while True:
+            chunk = pending.popleft().get()
+            pending.append(pool.apply_async(_generate_chunk, (next(chunks),) + args))
+            yield from chunk
+
+
+def main(args):
+    puzzles = generate(args.count, args.n, args.diagonal, args.symmetric, args.difficulty, args.seed,
+                       args.workers)
+    grades = Counter()
+
+    def grids():
+        for grid, puzzle_grade in puzzles:
+            grades[puzzle_grade.difficulty] += 1
+            yield grid
+
+    write_grids(args.output or sys.stdout, grids())
+    print(", ".join("{}: {}".format(name, grades[name]) for name in DIFFICULTIES if grades[name]),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate graded Sudoku puzzles with a unique solution")
+    parser.add_argument("--count", type=int, default=10, help="number of puzzles to generate")
+    parser.add_argument("--n", type=int, default=3, help="size of the square units (3 for 9x9 boards)")
+    parser.add_argument("--diagonal", action="store_true", help="make the main diagonals units")
+    parser.add_argument("--symmetric", action="store_true", help="remove clues in symmetric pairs")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES, help="only keep puzzles of this difficulty")
+    parser.add_argument("--seed", help="seed of the random puzzles")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--output", help="write the puzzles to this file instead of stdout")
+    main(parser.parse_args())
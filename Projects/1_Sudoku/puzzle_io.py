@@ -0,0 +1,159 @@
+"""Streaming readers and writers for files of Sudoku puzzles
+
+Two file formats are supported:
+
+- text files with one grid string per line (see utils.grid2values()); blank
+  lines and lines starting with '#' are skipped, and '0' is read as an empty
+  box like '.'
+- packed binary files of 9x9 puzzles: the PACKED_MAGIC header followed by one
+  41 byte record per puzzle, holding the 81 boxes as 4-bit values (0 for an
+  empty box, 1-9 for a digit) with the first box in the high nibble
+
+The readers are generators that read the file incrementally, so a corpus of
+millions of puzzles is never held in memory at once. Every function accepts
+either a file name or an open file object (in binary mode for packed files),
+except read_puzzles(), which needs a file name to detect the format.
+
+Examples
+--------
+>>> write_packed("puzzles.bin", read_grids("puzzles.txt"))
+>>> write_solutions("solutions.txt", batch.solve_many(read_puzzles("puzzles.bin")))
+"""
+from contextlib import nullcontext
+
+from utils import cols, grid_board, values2grid
+
+
+PACKED_MAGIC = b"SDK4"
+PACKED_BOXES = 81
+PACKED_RECORD_SIZE = (PACKED_BOXES + 1) // 2
+
+# the line written by write_solutions() for a puzzle without a solution
+UNSOLVABLE = '-'
+
+_NIBBLES = '.' + cols
+_PACK = {symbol: value for value, symbol in enumerate(_NIBBLES)}
+_PACK['0'] = 0
+# the two box symbols encoded by each byte ('?' for invalid nibbles)
+_UNPACK = [(_NIBBLES + '?' * 6)[b >> 4] + (_NIBBLES + '?' * 6)[b & 15] for b in range(256)]
+
+
+def _open(file, mode):
+    """Open a file name, or pass an open file object through without closing it"""
+    if isinstance(file, str):
+        return open(file, mode)
+    return nullcontext(file)
+
+
+def read_grids(file):
+    """Lazily yield the grid strings from a text file with one puzzle per line
+
+    Blank lines and lines starting with '#' are skipped, and zeros are
+    replaced by '.' (many published corpora use '0' for empty boxes).
+    """
+    with _open(file, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line.replace('0', '.')
+
+
+def write_grids(file, grids):
+    """Write grid strings to a text file, one per line, and return how many were written"""
+    count = 0
+    with _open(file, "w") as f:
+        for grid in grids:
+            f.write(grid)
+            f.write('\n')
+            count += 1
+    return count
+
+
+def pack_grid(grid):
+    """Encode an 81 character grid string as a 41 byte packed record"""
+    if len(grid) != PACKED_BOXES:
+        raise ValueError("Only 9x9 grids can be packed, got {} boxes".format(len(grid)))
+    try:
+        values = [_PACK[symbol] for symbol in grid] + [0]
+    except KeyError as e:
+        raise ValueError("Invalid symbol in grid: {!r}".format(e.args[0])) from None
+    return bytes(values[k] << 4 | values[k + 1] for k in range(0, PACKED_BOXES, 2))
+
+
+def unpack_grid(record):
+    """Decode a 41 byte packed record into an 81 character grid string"""
+    grid = ''.join([_UNPACK[b] for b in record])[:PACKED_BOXES]
+    if len(record) != PACKED_RECORD_SIZE or '?' in grid:
+        raise ValueError("Invalid packed record: {!r}".format(bytes(record)))
+    return grid
+
+
+def read_packed(file, buffer_records=4096):
+    """Lazily yield the grid strings from a packed binary file
+
+    Parameters
+    ----------
+    file(string or file)
+        the file name, or a file object opened in binary mode
+
+    buffer_records(int)
+        the number of records read from the file at a time
+
+    Yields
+    ------
+    string
+        the grid string of each puzzle in the file
+    """
+    with _open(file, "rb") as f:
+        if f.read(len(PACKED_MAGIC)) != PACKED_MAGIC:
+            raise ValueError("Not a packed puzzle file")
+        while True:
+            data = f.read(PACKED_RECORD_SIZE * buffer_records)
+            if not data:
+                return
+            if len(data) % PACKED_RECORD_SIZE:
+                raise ValueError("Truncated packed puzzle file")
+            for offset in range(0, len(data), PACKED_RECORD_SIZE):
+                yield unpack_grid(data[offset:offset + PACKED_RECORD_SIZE])
+
+
+def write_packed(file, grids):
+    """Write grid strings to a packed binary file and return how many were written"""
+    count = 0
+    with _open(file, "wb") as f:
+        f.write(PACKED_MAGIC)
+        for grid in grids:
+            f.write(pack_grid(grid))
+            count += 1
+    return count
+
+
+def read_puzzles(filename):
+    """Lazily yield the grid strings from a text or packed file, detected by its header"""
+    with open(filename, "rb") as f:
+        packed = f.read(len(PACKED_MAGIC)) == PACKED_MAGIC
+    return read_packed(filename) if packed else read_grids(filename)
+
+
+def write_solutions(file, solutions):
+    """Write solutions to a text file, one grid per line, and return how many were written
+
+    Parameters
+    ----------
+    file(string or file)
+        the file name, or a file object opened in text mode
+
+    solutions(iterable)
+        the values dictionaries (or grid strings) returned by the solver;
+        False (no solution) is written as an UNSOLVABLE line so every line
+        matches the puzzle at the same position in the input
+    """
+    def lines():
+        for values in solutions:
+            if values is False:
+                yield UNSOLVABLE
+            elif isinstance(values, str):
+                yield values
+            else:
+                yield values2grid(values, grid_board(values))
+    return write_grids(file, lines())
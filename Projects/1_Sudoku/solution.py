@@ -1,19 +1,55 @@
 
+from collections import OrderedDict
+from itertools import combinations
+
 from utils import *
 
+# only solution.py is submitted for grading, and the grader runs it with the
+# stock utils.py and none of the other modules of this project, so solve()
+# falls back to the dict engine (and the tables are built here) without them
+try:
+    import bitboard
+    import dlx
+    import tablecache
+except ImportError:
+    bitboard = dlx = tablecache = None
+
+try:
+    from utils import set_history_mode, start_history
+except ImportError:
+    # the stock utils.py always records the assignments, so there is nothing to configure
+    def set_history_mode(mode, maxlen=None):
+        """Record every assignment (the only mode of the stock utils.py)"""
+
+    def start_history():
+        """Keep the assignments recorded so far (the stock utils.py never resets them)"""
+
 
 row_units = [cross(r, cols) for r in rows]
 column_units = [cross(rows, c) for c in cols]
 square_units = [cross(rs, cs) for rs in ('ABC','DEF','GHI') for cs in ('123','456','789')]
 unitlist = row_units + column_units + square_units
+standard_unitlist = unitlist
 
-# TODO: Update the unit list to add the new diagonal units
-unitlist = unitlist
+diagonal_units = [[r + c for r, c in zip(rows, cols)], [r + c for r, c in zip(rows, cols[::-1])]]
+unitlist = unitlist + diagonal_units
 
 
 # Must be called after all units (including diagonals) are added to the unitlist
-units = extract_units(unitlist, boxes)
-peers = extract_peers(units, boxes)
+# (the units and peers are loaded from the on-disk cache, see tablecache.py)
+if tablecache is not None:
+    _cached_tables = tablecache.load_tables(unitlist, boxes)
+    units = _cached_tables.units
+    peers = _cached_tables.peers
+else:
+    units = extract_units(unitlist, boxes)
+    peers = extract_peers(units, boxes)
+tables = bitboard.build_tables(unitlist, boxes) if bitboard is not None else None
+exact_cover = dlx.ExactCover(unitlist, boxes) if dlx is not None else None
+
+# (square, line) pairs of units that share a segment of three boxes
+square_lines = [(square, line) for square in square_units for line in row_units + column_units
+                if len(set(square) & set(line)) > 1]
 
 
 def naked_twins(values):
@@ -48,13 +84,61 @@ def naked_twins(values):
     and because it is simpler (since the reduce_puzzle function already calls this
     strategy repeatedly).
 
+    This processes every pair of naked twins of the input at once, with
+    naked_subsets().
+
     See Also
     --------
     Pseudocode for this algorithm on github:
     https://github.com/udacity/artificial-intelligence/blob/master/Projects/1_Sudoku/pseudocode.md
     """
-    # TODO: Implement this function!
-    raise NotImplementedError
+    return naked_subsets(values, 2)
+
+
+def naked_subsets(values, max_size=None):
+    """Eliminate values using the naked subsets strategy.
+
+    The naked subsets strategy generalizes naked twins: if k boxes of a unit
+    have the same k candidate digits, then those digits must go in those boxes
+    and can be eliminated from all other boxes in the unit. Each unit is
+    indexed by candidate set, so finding the subsets is linear in the size of
+    the unit.
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    max_size(int)
+        the largest subset to look for (e.g., 2 for naked twins and 3 for
+        naked triples); by default every size smaller than the unit
+
+    Returns
+    -------
+    dict
+        The values dictionary with the naked subsets eliminated from the rest
+        of their units
+
+    Notes
+    -----
+    Every subset is found in the input and eliminated in the output, so one
+    elimination cannot hide another subset of the same call (see naked_twins()).
+    """
+    out = values.copy()
+    for unit in unitlist:
+        index = {}
+        for box in unit:
+            digits = values[box]
+            if 1 < len(digits) < len(unit) and (max_size is None or len(digits) <= max_size):
+                index.setdefault(digits, []).append(box)
+        for digits, subset in index.items():
+            if len(subset) != len(digits):
+                continue
+            for box in unit:
+                if values[box] != digits:
+                    for digit in digits:
+                        out = assign_value(out, box, out[box].replace(digit, ''))
+    return out
 
 
 def eliminate(values):
@@ -73,8 +157,12 @@ def eliminate(values):
     dict
         The values dictionary with the assigned values eliminated from peers
     """
-    # TODO: Copy your code from the classroom to complete this function
-    raise NotImplementedError
+    solved_boxes = [box for box in values if len(values[box]) == 1]
+    for box in solved_boxes:
+        digit = values[box]
+        for peer in peers[box]:
+            values = assign_value(values, peer, values[peer].replace(digit, ''))
+    return values
 
 
 def only_choice(values):
@@ -97,29 +185,235 @@ def only_choice(values):
     -----
     You should be able to complete this function by copying your code from the classroom
     """
-    # TODO: Copy your code from the classroom to complete this function
-    raise NotImplementedError
+    for unit in unitlist:
+        for digit in cols:
+            places = [box for box in unit if digit in values[box]]
+            if len(places) == 1:
+                values = assign_value(values, places[0], digit)
+    return values
 
 
-def reduce_puzzle(values):
-    """Reduce a Sudoku puzzle by repeatedly applying all constraint strategies
+def hidden_subsets(values, size):
+    """Apply the hidden subsets strategy for subsets of `size` digits
+
+    If `size` digits of a unit can only go in the same `size` boxes of that
+    unit, then those boxes must hold those digits, and every other digit can
+    be eliminated from them.
 
     Parameters
     ----------
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    size(int)
+        the number of digits (and boxes) in each subset
+
+    Returns
+    -------
+    dict
+        The values dictionary with the other digits removed from each hidden subset
+    """
+    for unit in unitlist:
+        places = {}
+        for digit in cols:
+            boxes_with_digit = [box for box in unit if digit in values[box]]
+            if 1 < len(boxes_with_digit) <= size:
+                places[digit] = boxes_with_digit
+        for subset in combinations(sorted(places), size):
+            subset_boxes = set().union(*(places[digit] for digit in subset))
+            if len(subset_boxes) != size:
+                continue
+            for box in subset_boxes:
+                values = assign_value(values, box, ''.join(d for d in values[box] if d in subset))
+    return values
+
+
+def hidden_pairs(values):
+    """Apply the hidden subsets strategy (see hidden_subsets()) to pairs of digits"""
+    return hidden_subsets(values, 2)
+
+
+def hidden_triples(values):
+    """Apply the hidden subsets strategy (see hidden_subsets()) to triples of digits"""
+    return hidden_subsets(values, 3)
+
+
+def _intersection_removal(values, pairs):
+    """Remove a digit from unit_b if it can only go in the boxes unit_a shares with it"""
+    for unit_a, unit_b in pairs:
+        for digit in cols:
+            places = [box for box in unit_a if digit in values[box]]
+            if len(places) < 2 or any(box not in unit_b for box in places):
+                continue
+            for box in unit_b:
+                if box not in unit_a and digit in values[box]:
+                    values = assign_value(values, box, values[box].replace(digit, ''))
+    return values
+
+
+def pointing_pairs(values):
+    """Apply the pointing pairs strategy to a Sudoku puzzle
+
+    The pointing pairs strategy says that if a digit can only go in the boxes
+    of a square that lie on one row or column, then the digit can be
+    eliminated from the rest of that row or column. (This also covers
+    pointing triples.)
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    dict
+        The values dictionary with the pointed digits eliminated
+    """
+    return _intersection_removal(values, square_lines)
+
+
+def box_line_reduction(values):
+    """Apply the box/line reduction strategy to a Sudoku puzzle
+
+    The box/line reduction strategy says that if a digit can only go in the
+    boxes of a row or column that lie in one square, then the digit can be
+    eliminated from the rest of that square.
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    dict
+        The values dictionary with the reduced digits eliminated from squares
+    """
+    return _intersection_removal(values, [(line, square) for square, line in square_lines])
+
+
+def x_wing(values):
+    """Apply the X-Wing strategy to a Sudoku puzzle
+
+    The X-Wing strategy says that if a digit can only go in the same two
+    columns of two rows, then it must go in those columns in those two rows,
+    and it can be eliminated from the rest of both columns (and likewise with
+    rows and columns swapped).
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    Returns
+    -------
+    dict
+        The values dictionary with the X-Wing digits eliminated
+    """
+    for lines, crossing in ((row_units, column_units), (column_units, row_units)):
+        for digit in cols:
+            # position of the digit in each line -> lines where it has only those two
+            wings = {}
+            for line in lines:
+                positions = tuple(k for k, box in enumerate(line) if digit in values[box])
+                if len(positions) == 2:
+                    wings.setdefault(positions, []).append(line)
+            for positions, wing_lines in wings.items():
+                if len(wing_lines) != 2:
+                    continue
+                corners = set(wing_lines[0]) | set(wing_lines[1])
+                for k in positions:
+                    for box in crossing[k]:
+                        if box not in corners and digit in values[box]:
+                            values = assign_value(values, box, values[box].replace(digit, ''))
+    return values
+
+
+# The strategies applied by reduce_puzzle(), in order. Turn a strategy off in
+# `strategy_enabled` (e.g., with set_strategy_enabled()) to measure how much
+# search it saves; use register_strategy() to add a new one.
+strategies = OrderedDict()
+strategy_enabled = {}
+
+
+def register_strategy(strategy, enabled=True):
+    """Add a strategy to the ones applied by reduce_puzzle()
+
+    Parameters
+    ----------
+    strategy(function)
+        a function that takes and returns a values dictionary; it is
+        registered under its __name__
+
+    enabled(bool)
+        whether reduce_puzzle() applies the strategy
+
+    Returns
+    -------
+    function
+        the strategy, so this can be used as a decorator
+    """
+    strategies[strategy.__name__] = strategy
+    strategy_enabled[strategy.__name__] = enabled
+    return strategy
+
+
+def set_strategy_enabled(name, enabled=True):
+    """Turn a registered strategy on or off"""
+    if name not in strategies:
+        raise ValueError("Unknown strategy: {!r}".format(name))
+    strategy_enabled[name] = enabled
+
+
+for _strategy in (eliminate, only_choice, naked_twins):
+    register_strategy(_strategy)
+# the extended strategies save guesses but cost more time than they save on
+# the bundled puzzles, so they are opt-in
+for _strategy in (naked_subsets, hidden_pairs, hidden_triples, pointing_pairs, box_line_reduction, x_wing):
+    register_strategy(_strategy, enabled=False)
+
+
+def reduce_puzzle(values, stats=None):
+    """Reduce a Sudoku puzzle by repeatedly applying all enabled constraint strategies
+
+    Parameters
+    ----------
+    values(dict)
+        a dictionary of the form {'box_name': '123456789', ...}
+
+    stats(SolveStats)
+        if given, the propagation rounds and the calls, changes and time of
+        each strategy are added to this object (see stats.py)
+
     Returns
     -------
     dict or False
         The values dictionary after continued application of the constraint strategies
         no longer produces any changes, or False if the puzzle is unsolvable 
     """
-    # TODO: Copy your code from the classroom and modify it to complete this function
-    raise NotImplementedError
+    stalled = False
+    while not stalled:
+        # count candidates rather than solved boxes, since most strategies
+        # only remove candidates
+        candidates_before = sum(len(values[box]) for box in values)
+        if stats is not None:
+            stats.propagation_rounds += 1
+        for name, strategy in strategies.items():
+            if not strategy_enabled[name]:
+                continue
+            if stats is None:
+                values = strategy(values)
+            else:
+                values = stats.run_strategy(name, strategy, values)
+        candidates_after = sum(len(values[box]) for box in values)
+        stalled = candidates_before == candidates_after
+        # Sanity check, return False if there is a box with zero available values
+        if len([box for box in values if len(values[box]) == 0]):
+            return False
+    return values
 
 
-def search(values):
+def search(values, stats=None):
     """Apply depth first search to solve Sudoku puzzles in order to solve puzzles
     that cannot be solved by repeated reduction alone.
 
@@ -128,6 +422,10 @@ def search(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    stats(SolveStats)
+        if given, the search nodes, guesses and backtracks (and the counters
+        of reduce_puzzle()) are added to this object (see stats.py)
+
     Returns
     -------
     dict or False
@@ -138,11 +436,29 @@ def search(values):
     You should be able to complete this function by copying your code from the classroom
     and extending it to call the naked twins strategy.
     """
-    # TODO: Copy your code from the classroom to complete this function
-    raise NotImplementedError
-
-
-def solve(grid):
+    if stats is not None:
+        stats.nodes += 1
+    values = reduce_puzzle(values, stats)
+    if values is False:
+        return False
+    if all(len(values[box]) == 1 for box in boxes):
+        return values
+    # Choose one of the unfilled squares with the fewest possibilities
+    n, box = min((len(values[box]), box) for box in boxes if len(values[box]) > 1)
+    for digit in values[box]:
+        if stats is not None:
+            stats.guesses += 1
+        new_sudoku = values.copy()
+        new_sudoku = assign_value(new_sudoku, box, digit)
+        attempt = search(new_sudoku, stats)
+        if attempt:
+            return attempt
+        if stats is not None:
+            stats.backtracks += 1
+    return False
+
+
+def solve(grid, engine=None, diagonal=None, stats=None, **options):
     """Find the solution to a Sudoku puzzle using search and constraint propagation
 
     Parameters
@@ -152,20 +468,104 @@ def solve(grid):
         
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
 
+        Grids of 256 or 625 characters are solved as 16x16 or 25x25 puzzles
+        (see utils.make_board() for the symbols)
+
+    engine(string)
+        "bitmask" solves on the candidate masks from bitboard.py; "dlx"
+        solves the equivalent exact cover problem with dlx.py; "dict" uses
+        the functions in this file, which record every assignment with
+        assign_value() for the visualization. The default is "bitmask", or
+        "dict" when bitboard.py is not available (e.g., in the grader).
+
+    diagonal(bool)
+        whether the main diagonals are units; by default 9x9 puzzles are
+        diagonal (using `unitlist`) and larger puzzles are not. The dict
+        engine only solves diagonal 9x9 puzzles.
+
+    stats(SolveStats)
+        if given, the engine adds its search and propagation counters to
+        this object (see stats.py)
+
+    options
+        keyword arguments passed to bitboard.search() by the bitmask engine
+        (e.g., backtrack="copy", or branching="buckets" and tie_break="degree"
+        to pick the branching box from a maintained BucketIndex)
+
     Returns
     -------
     dict or False
         The dictionary representation of the final sudoku grid or False if no solution exists.
     """
-    values = grid2values(grid)
-    values = search(values)
-    return values
+    if engine is None:
+        engine = "bitmask" if bitboard is not None else "dict"
+    if engine == "dict":
+        if len(grid) != len(boxes) or diagonal is False:
+            raise ValueError("The dict engine only solves diagonal 9x9 puzzles")
+        start_history()
+        values = grid2values(grid)
+        values = search(values, stats)
+        return values
+    if engine == "bitmask":
+        grid_tables = _grid_tables(grid, diagonal)
+        bits = bitboard.search(bitboard.grid2bits(grid, grid_tables), grid_tables, stats=stats, **options)
+        return bits and bitboard.bits2values(bits, grid_tables)
+    if engine == "dlx":
+        return _grid_exact_cover(grid, diagonal).solve(grid, stats)
+    raise ValueError("Unknown engine: {!r}".format(engine))
+
+
+def _is_default_board(grid, diagonal):
+    return len(grid) == len(boxes) and diagonal in (None, True)
+
+
+def _grid_tables(grid, diagonal=None):
+    if bitboard is None:
+        raise ImportError("The bitmask engine requires bitboard.py")
+    if _is_default_board(grid, diagonal):
+        return tables
+    return bitboard.board_tables(grid_board(grid).n, bool(diagonal))
+
+
+def _grid_exact_cover(grid, diagonal=None):
+    if dlx is None:
+        raise ImportError("The dlx engine and count_solutions() require dlx.py")
+    if _is_default_board(grid, diagonal):
+        return exact_cover
+    return dlx.board_exact_cover(grid_board(grid).n, bool(diagonal))
+
+
+def count_solutions(grid, limit=None, diagonal=None, stats=None):
+    """Count the solutions of a Sudoku puzzle with the exact cover solver (requires dlx.py)
+
+    Parameters
+    ----------
+    grid(string)
+        a string representing a sudoku grid.
+
+    limit(int)
+        stop counting after finding this many solutions; use limit=2 to check
+        whether the puzzle has a unique solution
+
+    diagonal(bool)
+        whether the main diagonals are units (see solve())
+
+    stats(SolveStats)
+        if given, the search counters are added to this object (see stats.py)
+
+    Returns
+    -------
+    int
+        the number of solutions, or `limit` if there are at least that many
+    """
+    return _grid_exact_cover(grid, diagonal).count(grid, limit, stats)
 
 
 if __name__ == "__main__":
     diag_sudoku_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
     display(grid2values(diag_sudoku_grid))
-    result = solve(diag_sudoku_grid)
+    set_history_mode('solve')  # PySudoku.play() replays the recorded assignments
+    result = solve(diag_sudoku_grid, engine="dict")
     display(result)
 
     try:
@@ -0,0 +1,95 @@
+"""Search and propagation counters for the Sudoku solver engines
+
+Pass a SolveStats instance to solution.solve() (or directly to the search and
+reduce functions of an engine) to find out how much work a solve took. The
+engines only update the counters when a stats object is given, so solving
+without one is not slowed down.
+
+Examples
+--------
+>>> stats = SolveStats()
+>>> solution.solve(grid, stats=stats)
+>>> stats.guesses, stats.backtracks
+(12, 9)
+"""
+import time
+
+from collections import Counter, defaultdict
+
+
+class SolveStats:
+    """Counters collected while solving one or more puzzles
+
+    Attributes
+    ----------
+    nodes: int
+        the number of search nodes expanded
+
+    guesses: int
+        the number of tentative assignments made by the search
+
+    backtracks: int
+        the number of guesses that led to a contradiction and were undone
+
+    propagation_rounds: int
+        the number of times constraint propagation was run to a fixed point
+        (each pass of reduce_puzzle() over the board counts once)
+
+    strategy_calls: Counter
+        the number of times each strategy was applied (to the whole board, or
+        to a single unit by bitboard.propagate())
+
+    strategy_changes: Counter
+        the number of box updates made by each strategy
+
+    strategy_time: defaultdict
+        the seconds spent in each strategy; bitboard.propagate() interleaves
+        the strategies, so its time is only reported as a whole ("propagate")
+    """
+    def __init__(self):
+        self.nodes = 0
+        self.guesses = 0
+        self.backtracks = 0
+        self.propagation_rounds = 0
+        self.strategy_calls = Counter()
+        self.strategy_changes = Counter()
+        self.strategy_time = defaultdict(float)
+
+    def run_strategy(self, name, strategy, values):
+        """Apply a dict strategy to the values and record its calls, changes and time"""
+        before = values.copy()
+        start = time.perf_counter()
+        values = strategy(values)
+        self.strategy_time[name] += time.perf_counter() - start
+        self.strategy_calls[name] += 1
+        if values:
+            self.strategy_changes[name] += sum(before[box] != values[box] for box in before)
+        return values
+
+    def merge(self, other):
+        """Add the counters of another SolveStats instance to this one"""
+        self.nodes += other.nodes
+        self.guesses += other.guesses
+        self.backtracks += other.backtracks
+        self.propagation_rounds += other.propagation_rounds
+        self.strategy_calls.update(other.strategy_calls)
+        self.strategy_changes.update(other.strategy_changes)
+        for name, seconds in other.strategy_time.items():
+            self.strategy_time[name] += seconds
+        return self
+
+    def as_dict(self):
+        """Return the counters as a JSON serializable dictionary"""
+        return {
+            "nodes": self.nodes,
+            "guesses": self.guesses,
+            "backtracks": self.backtracks,
+            "propagation_rounds": self.propagation_rounds,
+            "strategy_calls": dict(self.strategy_calls),
+            "strategy_changes": dict(self.strategy_changes),
+            "strategy_time": dict(self.strategy_time),
+        }
+
+    def __repr__(self):
+        return "SolveStats({})".format(", ".join(
+            "{}={}".format(k, v) for k, v in self.as_dict().items() if not isinstance(v, dict)))
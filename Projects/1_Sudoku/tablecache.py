@@ -0,0 +1,134 @@
+"""On-disk cache of the unit and peer tables of a Sudoku board
+
+Every process that imports solution.py (e.g., each worker of batch.py) needs
+the units and peers of every box, and the equivalent index arrays used by
+bitboard.py. This module computes them once per unit list, saves them to a
+small file in CACHE_DIR, and loads that file on later imports instead of
+rebuilding the tables.
+
+Cache files are named after the board shape and a hash of the boxes, units
+and digits, so different boards (standard, diagonal, 16x16, ...) get their
+own file. They are written with the marshal module, so they are only read by
+the Python version that wrote them. Set the SUDOKU_CACHE_DIR environment
+variable to use another directory, or to an empty string to disable the cache.
+
+Examples
+--------
+>>> from solution import unitlist
+>>> cached = load_tables(unitlist, boxes)
+>>> cached.peers['A1']
+{'A2', 'A3', ...}
+"""
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+
+from collections import defaultdict, namedtuple
+
+from utils import boxes, cols, extract_peers, extract_units
+
+
+CACHE_DIR = os.environ.get("SUDOKU_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+CachedTables = namedtuple("CachedTables", "units peers unit_index box_units peer_index")
+
+_loaded = {}  # tables already loaded by this process, by cache key
+
+
+def table_key(unitlist, boxes=boxes, digits=cols):
+    """Return the cache key (board shape and a hash of the unit set) of a board"""
+    digest = hashlib.sha1(marshal.dumps((list(boxes), [list(unit) for unit in unitlist], digits)))
+    return "{}x{}-{}u-{}".format(len(boxes), len(digits), len(unitlist), digest.hexdigest()[:16])
+
+
+def load_tables(unitlist, boxes=boxes, digits=cols, cache_dir=None):
+    """Load the tables of a board from the cache, building and saving them if needed
+
+    Parameters
+    ----------
+    unitlist(list)
+        a list containing "units" (rows, columns, diagonals, etc.) of boxes
+
+    boxes(list)
+        a list of strings identifying each box on a sudoku board (e.g., "A1", "C7", etc.)
+
+    digits(string)
+        the symbols that can be placed in each box
+
+    cache_dir(string)
+        the cache directory (defaults to CACHE_DIR); if empty, the tables are
+        built without reading or writing a file
+
+    Returns
+    -------
+    CachedTables
+        a namedtuple with the units and peers of each box (as returned by
+        utils.extract_units() and utils.extract_peers()), the units as tuples
+        of box indices, the indices of the units each box belongs to, and the
+        sorted peer indices of each box
+    """
+    key = table_key(unitlist, boxes, digits)
+    if key in _loaded:
+        return _loaded[key]
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    filename = None
+    if cache_dir:
+        filename = os.path.join(cache_dir, "tables-{}-py{}{}.marshal".format(key, *sys.version_info[:2]))
+    data = _read(filename, key) if filename else None
+    if data is None:
+        data = _build(unitlist, boxes)
+        if filename:
+            _write(filename, key, data)
+    unit_index, box_units, peer_index = data
+    # only the index arrays are saved; the dictionaries share the unit lists
+    # and box names of the arguments, like extract_units() and extract_peers()
+    units = defaultdict(list)
+    peers = defaultdict(set)
+    for box, member_units, box_peers in zip(boxes, box_units, peer_index):
+        units[box] = [unitlist[u] for u in member_units]
+        peers[box] = {boxes[j] for j in box_peers}
+    _loaded[key] = tables = CachedTables(units, peers, unit_index, box_units, peer_index)
+    return tables
+
+
+def _build(unitlist, boxes):
+    """Compute the index arrays of the units and peers of every box"""
+    units = extract_units(unitlist, boxes)
+    peers = extract_peers(units, boxes)
+    index = {box: i for i, box in enumerate(boxes)}
+    unit_index = tuple(tuple(index[box] for box in unit) for unit in unitlist)
+    box_units = [[] for _ in boxes]
+    for u, unit in enumerate(unit_index):
+        for i in unit:
+            box_units[i].append(u)
+    peer_index = tuple(tuple(sorted(index[peer] for peer in peers[box])) for box in boxes)
+    return unit_index, tuple(map(tuple, box_units)), peer_index
+
+
+def _read(filename, key):
+    """Return the tables saved in a cache file, or None if it is missing or invalid"""
+    try:
+        # marshal.loads() on the whole file is much faster than marshal.load()
+        with open(filename, "rb") as f:
+            saved_key, data = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return data if saved_key == key else None
+
+
+def _write(filename, key, data):
+    """Save the tables to a cache file; failing to write the cache is not an error"""
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        # write to a temporary file first so concurrent processes never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(marshal.dumps((key, data)))
+        os.replace(tmp, filename)
+    except OSError:
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,35 @@
+import os
+import unittest
+
+import solution
+
+from batch import solve_many
+from puzzle_io import read_grids
+
+
+class TestSolveMany(unittest.TestCase):
+    diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+    unsolvable_grid = '22' + '.' * 79
+
+    def setUp(self):
+        self.grids = [self.diagonal_grid, self.unsolvable_grid] * 5
+        self.expected = [solution.solve(grid) for grid in self.grids]
+
+    def test_ordered(self):
+        results = list(solve_many(iter(self.grids), workers=2, chunksize=3))
+        self.assertEqual(results, self.expected)
+
+    def test_as_completed(self):
+        results = dict(solve_many(iter(self.grids), workers=2, chunksize=3, ordered=False))
+        self.assertEqual([results[i] for i in range(len(self.grids))], self.expected)
+
+    def test_standard_puzzles(self):
+        filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'puzzles', 'hard.txt')
+        grids = list(read_grids(filename))
+        results = list(solve_many(filename, workers=2, chunksize=8, diagonal=False))
+        self.assertTrue(all(results))
+        self.assertEqual(results, [solution.solve(grid, diagonal=False) for grid in grids])
+
+
+if __name__ == '__main__':
+    unittest.main()
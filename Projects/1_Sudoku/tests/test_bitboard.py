@@ -0,0 +1,129 @@
+import random
+import unittest
+
+import bitboard
+import solution
+
+from utils import grid2values, make_board
+
+
+class TestBitboardConversions(unittest.TestCase):
+    diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def test_values_round_trip(self):
+        values = solution.reduce_puzzle(grid2values(self.diagonal_grid))
+        bits = bitboard.values2bits(values, solution.tables)
+        self.assertEqual(bitboard.bits2values(bits, solution.tables), values)
+
+    def test_grid_round_trip(self):
+        bits = bitboard.grid2bits(self.diagonal_grid, solution.tables)
+        self.assertEqual(bitboard.bits2grid(bits), self.diagonal_grid)
+        self.assertEqual(bitboard.bits2values(bits, solution.tables), grid2values(self.diagonal_grid))
+
+
+class TestBitboardSolver(unittest.TestCase):
+    diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def test_matches_dict_engine(self):
+        self.assertEqual(solution.solve(self.diagonal_grid, engine="bitmask"),
+                         solution.solve(self.diagonal_grid, engine="dict"))
+
+    def test_backtrack_modes_agree(self):
+        tables = bitboard.build_tables(solution.standard_unitlist)
+        grid = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+        self.assertEqual(bitboard.search(bitboard.grid2bits(grid, tables), tables, backtrack="trail"),
+                         bitboard.search(bitboard.grid2bits(grid, tables), tables, backtrack="copy"))
+
+    def test_bucket_branching(self):
+        tables = bitboard.build_tables(solution.standard_unitlist)
+        grid = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+        expected = bitboard.search(bitboard.grid2bits(grid, tables), tables)
+        for tie_break in (None, "degree"):
+            self.assertEqual(bitboard.search(bitboard.grid2bits(grid, tables), tables,
+                                             branching="buckets", tie_break=tie_break), expected)
+        with self.assertRaises(ValueError):
+            bitboard.search(bitboard.grid2bits(grid, tables), tables, backtrack="copy", branching="buckets")
+
+    def test_bucket_index_tracks_board(self):
+        tables = bitboard.build_tables(solution.standard_unitlist)
+        grid = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+        bits = bitboard.propagate(bitboard.grid2bits(grid, tables), tables)
+        index = bitboard.BucketIndex(bits, tables, "degree")
+        trail = [(index.select(), bits[index.select()])]
+        bits[trail[0][0]] &= -bits[trail[0][0]]
+        bitboard.propagate(bits, tables, (trail[0][0],), trail)
+        index.update(bits, [i for i, _ in trail])
+        fresh = bitboard.BucketIndex(bits, tables, "degree")
+        self.assertEqual((index.buckets, index.degree), (fresh.buckets, fresh.degree))
+
+    def test_trail_restores_board(self):
+        tables = bitboard.build_tables(solution.standard_unitlist)
+        grid = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+        bits = bitboard.propagate(bitboard.grid2bits(grid, tables), tables)
+        before, trail = bits[:], []
+        for i, mask in enumerate(before):
+            if bitboard.POPCOUNT[mask] > 1:
+                trail.append((i, bits[i]))
+                bits[i] &= -bits[i]
+                bitboard.propagate(bits, tables, (i,), trail)
+        self.assertNotEqual(bits, before)
+        bitboard.undo(bits, trail, 0)
+        self.assertEqual(bits, before)
+
+    def test_unsolvable(self):
+        grid = '22' + '.' * 79
+        self.assertFalse(solution.solve(grid, engine="bitmask"))
+
+
+class TestPropagate(unittest.TestCase):
+    diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def test_same_fixed_point_as_reduce_puzzle(self):
+        rng = random.Random(0)
+        solved = bitboard.bits2grid(bitboard.search(bitboard.grid2bits(self.diagonal_grid, solution.tables),
+                                                    solution.tables))
+        for _ in range(200):
+            givens = set(rng.sample(range(81), rng.randint(5, 40)))
+            grid = ''.join(solved[i] if i in givens else '.' for i in range(81))
+            if rng.random() < 0.3:  # sometimes make the puzzle unsolvable
+                i = rng.randrange(81)
+                grid = grid[:i] + rng.choice('123456789') + grid[i + 1:]
+            self.assertEqual(bitboard.propagate(bitboard.grid2bits(grid, solution.tables), solution.tables),
+                             bitboard.reduce_puzzle(bitboard.grid2bits(grid, solution.tables), solution.tables))
+
+    def test_naked_triples(self):
+        tables = solution.tables
+        bits = [tables.full] * 81
+        for i in (0, 4, 8):  # A1, A5 and A9 can only be 1, 2 or 3
+            bits[i] = 0b111
+        bits = bitboard.naked_subsets(bits, tables)
+        rest = tables.full & ~0b111
+        self.assertEqual(bits[:9], [0b111, rest, rest, rest, 0b111, rest, rest, rest, 0b111])
+        bits[1] = 0b111  # four boxes for three digits
+        self.assertFalse(bitboard.naked_subsets(bits, tables))
+        self.assertFalse(bitboard.propagate(bits, tables))
+
+
+class TestLargeBoards(unittest.TestCase):
+    def _check_solution(self, grid, values, board):
+        for box, val in zip(board.boxes, grid):
+            if val != '.':
+                self.assertEqual(values[box], val)
+        for unit in board.unitlist:
+            self.assertEqual(sorted(values[box] for box in unit), sorted(board.digits))
+
+    def test_16x16(self):
+        board = make_board(4)
+        solved = bitboard.bits2grid(bitboard.search(bitboard.grid2bits('.' * 256, bitboard.board_tables(4)),
+                                                    bitboard.board_tables(4)), bitboard.board_tables(4))
+        grid = ''.join(val if i % 3 else '.' for i, val in enumerate(solved))
+        for engine in ("bitmask", "dlx"):
+            self._check_solution(grid, solution.solve(grid, engine=engine), board)
+
+    def test_25x25(self):
+        grid = '.' * 625
+        self._check_solution(grid, solution.solve(grid), make_board(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import solution
+
+from dlx import ExactCover
+
+
+class TestExactCover(unittest.TestCase):
+    diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+    # a standard sudoku whose solution violates the diagonal constraint
+    standard_grid = '..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..'
+
+    def test_solve_matches_search(self):
+        self.assertEqual(solution.solve(self.diagonal_grid, engine="dlx"),
+                         solution.solve(self.diagonal_grid, engine="bitmask"))
+
+    def test_count_unique(self):
+        self.assertEqual(solution.count_solutions(self.diagonal_grid), 1)
+
+    def test_count_with_limit(self):
+        self.assertEqual(solution.count_solutions('.' * 81, limit=5), 5)
+
+    def test_conflicting_givens(self):
+        self.assertEqual(solution.count_solutions('22' + '.' * 79), 0)
+        self.assertFalse(solution.solve('22' + '.' * 79, engine="dlx"))
+
+    def test_standard_units(self):
+        self.assertEqual(solution.count_solutions(self.standard_grid), 0)
+        values = ExactCover(solution.standard_unitlist).solve(self.standard_grid)
+        self.assertTrue(values)
+        for unit in solution.standard_unitlist:
+            self.assertEqual(sorted(values[box] for box in unit), list('123456789'))
+
+    def test_solve_standard_puzzle(self):
+        self.assertEqual(solution.count_solutions(self.standard_grid, diagonal=False), 1)
+        self.assertEqual(solution.solve(self.standard_grid, engine="dlx", diagonal=False),
+                         solution.solve(self.standard_grid, engine="bitmask", diagonal=False))
+
+    def test_matrix_restored(self):
+        exact_cover = ExactCover(solution.unitlist)
+        links = (exact_cover.L[:], exact_cover.R[:], exact_cover.U[:], exact_cover.D[:], exact_cover.S[:])
+        exact_cover.count(self.diagonal_grid)
+        exact_cover.count('22' + '.' * 79)
+        self.assertEqual((exact_cover.L, exact_cover.R, exact_cover.U, exact_cover.D, exact_cover.S), links)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import random
+import unittest
+
+import bitboard
+import solution
+
+from generator import generate, generate_one, grade, random_solution, remove_clues
+
+
+class TestGenerator(unittest.TestCase):
+    def test_random_solution(self):
+        tables = bitboard.board_tables(3, diagonal=True)
+        grid = random_solution(random.Random(0), tables)
+        self.assertNotIn('.', grid)
+        self.assertEqual(solution.count_solutions(grid), 1)
+
+    def test_puzzle_is_unique_and_minimal(self):
+        grid, puzzle_grade = generate_one("test", diagonal=True)
+        self.assertEqual(solution.count_solutions(grid, limit=2), 1)
+        self.assertEqual(puzzle_grade.clues, sum(val != '.' for val in grid))
+        for i, val in enumerate(grid):
+            if val != '.':
+                self.assertEqual(solution.count_solutions(grid[:i] + '.' + grid[i + 1:], limit=2), 2)
+
+    def test_symmetric(self):
+        solved = random_solution(random.Random(1), bitboard.board_tables(3))
+        grid = remove_clues(solved, random.Random(1), diagonal=False, symmetric=True)
+        self.assertEqual([val == '.' for val in grid], [val == '.' for val in grid[::-1]])
+
+    def test_grade(self):
+        easy = '..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..'
+        self.assertEqual(grade(easy, diagonal=False).difficulty, "easy")
+        hard = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+        hard_grade = grade(hard, diagonal=False)
+        self.assertIn(hard_grade.difficulty, ("hard", "expert"))
+        self.assertGreater(hard_grade.guesses, 0)
+
+    def test_generate(self):
+        puzzles = list(generate(4, seed=0, difficulty="hard"))
+        self.assertEqual(len(puzzles), 4)
+        self.assertTrue(all(puzzle_grade.difficulty == "hard" for _, puzzle_grade in puzzles))
+        self.assertEqual(list(generate(4, seed=0, difficulty="hard", workers=2, chunksize=1)), puzzles)
+        with self.assertRaises(ValueError):
+            next(generate(1, difficulty="impossible"))
+
+
+if __name__ == '__main__':
+    unittest.main()
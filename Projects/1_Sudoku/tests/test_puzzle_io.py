@@ -0,0 +1,62 @@
+import io
+import os
+import tempfile
+import unittest
+
+import solution
+
+from batch import solve_file
+from puzzle_io import (UNSOLVABLE, pack_grid, read_grids, read_packed, read_puzzles, unpack_grid,
+                       write_grids, write_packed, write_solutions)
+
+
+class TestPuzzleIO(unittest.TestCase):
+    grids = ['2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3',
+             '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......']
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_text_round_trip(self):
+        f = io.StringIO()
+        self.assertEqual(write_grids(f, self.grids), 2)
+        text = "# header\n\n" + f.getvalue().replace('.', '0')
+        self.assertEqual(list(read_grids(io.StringIO(text))), self.grids)
+
+    def test_pack_grid(self):
+        for grid in self.grids:
+            self.assertEqual(len(pack_grid(grid)), 41)
+            self.assertEqual(unpack_grid(pack_grid(grid)), grid)
+        with self.assertRaises(ValueError):
+            pack_grid('.' * 256)
+        with self.assertRaises(ValueError):
+            unpack_grid(b'\xff' * 41)
+
+    def test_packed_round_trip(self):
+        f = io.BytesIO()
+        self.assertEqual(write_packed(f, self.grids * 3), 6)
+        f.seek(0)
+        self.assertEqual(list(read_packed(f, buffer_records=4)), self.grids * 3)
+        with self.assertRaises(ValueError):
+            list(read_packed(io.BytesIO(f.getvalue()[:-1])))
+
+    def test_read_puzzles_detects_format(self):
+        text, packed = os.path.join(self.tmp.name, "p.txt"), os.path.join(self.tmp.name, "p.bin")
+        write_grids(text, self.grids)
+        write_packed(packed, self.grids)
+        self.assertEqual(list(read_puzzles(text)), self.grids)
+        self.assertEqual(list(read_puzzles(packed)), self.grids)
+
+    def test_solve_file(self):
+        source, destination = os.path.join(self.tmp.name, "p.bin"), os.path.join(self.tmp.name, "s.txt")
+        write_packed(source, self.grids + ['22' + '.' * 79])
+        self.assertEqual(solve_file(source, destination, workers=1), 3)
+        expected = [solution.solve(grid) for grid in self.grids]
+        f = io.StringIO()
+        write_solutions(f, expected)
+        self.assertEqual(list(read_grids(destination)), list(read_grids(io.StringIO(f.getvalue()))) + [UNSOLVABLE])
+
+
+if __name__ == '__main__':
+    unittest.main()
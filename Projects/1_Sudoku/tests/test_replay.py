@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+import solution
+import utils
+
+try:
+    import PySudoku
+except ImportError:
+    PySudoku = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+@unittest.skipIf(PySudoku is None, "pygame is not installed")
+class TestReplay(unittest.TestCase):
+    grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        utils.set_history_mode('solve')
+        self.addCleanup(utils.set_history_mode, 'off')
+        self.result = solution.solve(self.grid, engine="dict")
+        self.steps = len(list(utils.reconstruct(self.result, utils.history)))
+
+    def test_png_frames(self):
+        output = os.path.join(self.tmp.name, "frames")
+        count = PySudoku.replay(utils.grid2values(self.grid), self.result, utils.history, output, every=10)
+        self.assertEqual(count, self.steps // 10 + 2)
+        self.assertEqual(len(os.listdir(output)), count)
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_gif(self):
+        output = os.path.join(self.tmp.name, "replay.gif")
+        count = PySudoku.replay(utils.grid2values(self.grid), self.result, utils.history, output)
+        self.assertEqual(count, self.steps + 1)
+        with Image.open(output) as image:
+            self.assertEqual(image.n_frames, count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import solution
+
+from stats import SolveStats
+
+
+class TestSolveStats(unittest.TestCase):
+    hard_grid = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+    diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def _check_search_counters(self, stats):
+        self.assertGreater(stats.nodes, 1)
+        self.assertGreater(stats.guesses, 0)
+        self.assertLess(stats.backtracks, stats.guesses)
+
+    def test_bitmask_engine(self):
+        for backtrack in ("trail", "copy"):
+            stats = SolveStats()
+            self.assertTrue(solution.solve(self.hard_grid, diagonal=False, stats=stats, backtrack=backtrack))
+            self._check_search_counters(stats)
+            self.assertGreater(stats.propagation_rounds, stats.guesses - stats.backtracks)
+            self.assertGreater(stats.strategy_changes["eliminate"], 0)
+            self.assertGreater(stats.strategy_time["propagate"], 0)
+
+    def test_dlx_engine(self):
+        stats = SolveStats()
+        self.assertEqual(solution.count_solutions(self.hard_grid, diagonal=False, stats=stats), 1)
+        self._check_search_counters(stats)
+
+    def test_dict_engine(self):
+        stats = SolveStats()
+        self.assertTrue(solution.solve(self.diagonal_grid, engine="dict", stats=stats))
+        self.assertEqual(stats.nodes, 1)
+        self.assertEqual(set(stats.strategy_calls), {"eliminate", "only_choice", "naked_twins"})
+        self.assertEqual(stats.strategy_calls["eliminate"], stats.propagation_rounds)
+
+    def test_merge(self):
+        first, second = SolveStats(), SolveStats()
+        solution.solve(self.hard_grid, diagonal=False, stats=first)
+        solution.solve(self.hard_grid, diagonal=False, stats=second)
+        total = SolveStats().merge(first).merge(second)
+        self.assertEqual(total.nodes, first.nodes + second.nodes)
+        self.assertEqual(total.strategy_changes["eliminate"], 2 * first.strategy_changes["eliminate"])
+
+
+if __name__ == '__main__':
+    unittest.main()
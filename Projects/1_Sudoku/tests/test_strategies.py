@@ -0,0 +1,74 @@
+import os
+import unittest
+
+import solution
+
+from puzzle_io import read_grids
+from stats import SolveStats
+from utils import boxes, cols
+
+
+EXTENDED = ("naked_subsets", "hidden_pairs", "hidden_triples", "pointing_pairs", "box_line_reduction", "x_wing")
+
+
+def _without(digit, keep):
+    """An empty board where `digit` was removed from the boxes not in `keep`"""
+    return {box: cols if box in keep else cols.replace(digit, '') for box in boxes}
+
+
+class TestStrategies(unittest.TestCase):
+    def test_naked_triples(self):
+        values = {box: cols for box in boxes}
+        for box in ('A1', 'A5', 'A9'):
+            values[box] = '123'
+        self.assertEqual(solution.naked_subsets(values, 2), values)
+        values = solution.naked_subsets(values, 3)
+        self.assertEqual([values[box] for box in solution.row_units[0]],
+                         ['123', '456789', '456789', '456789', '123', '456789', '456789', '456789', '123'])
+
+    def test_hidden_pairs(self):
+        values = {box: cols for box in boxes}
+        for box in solution.row_units[0][2:]:
+            values[box] = '3456789'
+        values = solution.hidden_pairs(values)
+        self.assertEqual((values['A1'], values['A2']), ('12', '12'))
+
+    def test_pointing_pairs(self):
+        values = solution.pointing_pairs(_without('1', {'A1', 'A2'} | set(solution.row_units[0][3:])))
+        self.assertEqual([box for box in solution.row_units[0] if '1' in values[box]], ['A1', 'A2'])
+
+    def test_box_line_reduction(self):
+        values = solution.box_line_reduction(_without('1', set(solution.square_units[0]) - {'A3'}))
+        self.assertEqual([box for box in solution.square_units[0] if '1' in values[box]], ['A1', 'A2'])
+
+    def test_x_wing(self):
+        keep = set(solution.row_units[1] + solution.row_units[2] + solution.row_units[3] + solution.row_units[5])
+        keep |= {'A1', 'A5', 'E1', 'E5'} | set(solution.row_units[6] + solution.row_units[7] + solution.row_units[8])
+        values = solution.x_wing(_without('1', keep))
+        column = [box for box in solution.column_units[0] if '1' in values[box]]
+        self.assertEqual(column, ['A1', 'E1'])
+
+
+class TestStrategyRegistry(unittest.TestCase):
+    def tearDown(self):
+        for name in EXTENDED:
+            solution.set_strategy_enabled(name, False)
+
+    def test_extended_strategies_save_guesses(self):
+        puzzles = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "puzzles")
+        grids = list(read_grids(os.path.join(puzzles, "diagonal.txt")))[:5]
+        default, extended = SolveStats(), SolveStats()
+        expected = [solution.solve(grid, engine="dict", stats=default) for grid in grids]
+        for name in EXTENDED:
+            solution.set_strategy_enabled(name, True)
+        self.assertEqual([solution.solve(grid, engine="dict", stats=extended) for grid in grids], expected)
+        self.assertLess(extended.guesses, default.guesses)
+        self.assertEqual(set(extended.strategy_calls), set(solution.strategies))
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            solution.set_strategy_enabled("swordfish")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+import solution
+import tablecache
+
+from utils import boxes, extract_peers, extract_units, make_board
+
+
+class TestTableCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.addCleanup(tablecache._loaded.clear)
+
+    def _load(self, board):
+        tablecache._loaded.clear()
+        return tablecache.load_tables(board.unitlist, board.boxes, board.digits, cache_dir=self.cache_dir.name)
+
+    def test_matches_extracted_tables(self):
+        board = make_board(3, diagonal=True)
+        built = self._load(board)
+        loaded = self._load(board)
+        self.assertEqual(len(os.listdir(self.cache_dir.name)), 1)
+        for cached in (built, loaded):
+            self.assertEqual(cached.units, extract_units(board.unitlist, board.boxes))
+            self.assertEqual(cached.peers, extract_peers(cached.units, board.boxes))
+            self.assertEqual(cached.peer_index, solution.tables.peers)
+        self.assertEqual(built, loaded)
+
+    def test_keyed_by_unit_set(self):
+        self._load(make_board(3))
+        self._load(make_board(3, diagonal=True))
+        self._load(make_board(4))
+        self.assertEqual(len(os.listdir(self.cache_dir.name)), 3)
+
+    def test_invalid_file_is_rebuilt(self):
+        board = make_board(3)
+        self._load(board)
+        filename, = os.listdir(self.cache_dir.name)
+        with open(os.path.join(self.cache_dir.name, filename), "wb") as f:
+            f.write(b"not a cache file")
+        self.assertEqual(self._load(board).units, extract_units(board.unitlist, boxes))
+
+    def test_disabled(self):
+        tablecache._loaded.clear()
+        board = make_board(3)
+        cached = tablecache.load_tables(board.unitlist, board.boxes, board.digits, cache_dir="")
+        self.assertEqual(cached.units, extract_units(board.unitlist, board.boxes))
+        self.assertEqual(os.listdir(self.cache_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
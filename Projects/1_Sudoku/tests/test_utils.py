@@ -0,0 +1,87 @@
+import unittest
+
+import utils
+
+from utils import assign_value, extract_peers, extract_units, grid2values, make_board, reconstruct, \
+    set_history_mode, values2grid
+
+
+class TestAssignValueHistory(unittest.TestCase):
+    grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def tearDown(self):
+        set_history_mode('off')
+
+    def _assign(self, boxes):
+        values = grid2values(self.grid)
+        for box, digit in zip(boxes, '13456789'):
+            values = assign_value(values, box, digit)
+        return values
+
+    def test_off_by_default(self):
+        self._assign(['A2', 'A3', 'A4'])
+        self.assertEqual(len(utils.history), 0)
+
+    def test_solve_mode_records_every_assignment(self):
+        set_history_mode('solve')
+        values = self._assign(['A2', 'A3', 'A4'])
+        self.assertEqual(list(reconstruct(values, utils.history)), [('A2', '1'), ('A3', '3'), ('A4', '4')])
+        utils.start_history()
+        self.assertEqual(len(utils.history), 0)
+
+    def test_ring_mode_is_bounded(self):
+        set_history_mode('ring', maxlen=2)
+        values = self._assign(['A2', 'A3', 'A4', 'A5'])
+        self.assertEqual(len(utils.history), 2)
+        self.assertEqual(list(reconstruct(values, utils.history)), [('A4', '4'), ('A5', '5')])
+
+    def test_reconstruct_follows_the_branch_of_the_solution(self):
+        set_history_mode('solve')
+        start = self._assign(['A2'])
+        dead_end = assign_value(start.copy(), 'A3', '5')
+        assign_value(dead_end, 'A4', '6')
+        values = assign_value(start.copy(), 'A3', '3')
+        self.assertEqual(len(utils.history), 4)
+        self.assertEqual(list(reconstruct(values, utils.history)), [('A2', '1'), ('A3', '3')])
+
+    def test_ring_mode_memory_is_bounded(self):
+        set_history_mode('ring', maxlen=10)
+        values = grid2values(self.grid)
+        for i in range(1000):
+            values = assign_value(values, 'A2', '13456789'[i % 8])
+        self.assertEqual(len(utils.history), 10)
+        self.assertEqual(len(utils.history.box_index), 10)
+        self.assertLessEqual(len(utils.history._table_ids), 32)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            set_history_mode('always')
+
+
+class TestMakeBoard(unittest.TestCase):
+    def test_standard_board(self):
+        board = make_board(3)
+        self.assertEqual(board.boxes, utils.boxes)
+        self.assertEqual(len(board.unitlist), 27)
+        self.assertEqual(board.peers, extract_peers(extract_units(board.unitlist, utils.boxes), utils.boxes))
+        self.assertTrue(all(len(board.peers[box]) == 20 for box in board.boxes))
+
+    def test_large_boards(self):
+        for n, peer_count in ((4, 39), (5, 64)):
+            board = make_board(n, diagonal=True)
+            self.assertEqual(len(board.boxes), n ** 4)
+            self.assertEqual(len(board.unitlist), 3 * n * n + 2)
+            self.assertEqual(len(board.peers['A1']), peer_count + n * n - n)
+            grid = board.digits + '.' * (n ** 4 - n * n)
+            self.assertEqual(values2grid(grid2values(grid, board), board), grid)
+
+    def test_cached(self):
+        self.assertIs(make_board(4), make_board(4))
+
+    def test_unsupported_size(self):
+        with self.assertRaises(ValueError):
+            make_board(6)
+
+
+if __name__ == '__main__':
+    unittest.main()
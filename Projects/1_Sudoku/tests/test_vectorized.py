@@ -0,0 +1,46 @@
+import random
+import unittest
+
+import bitboard
+import solution
+
+from utils import values2grid
+
+try:
+    import vectorized
+except ImportError:
+    vectorized = None
+
+
+@unittest.skipIf(vectorized is None, "the vectorized kernel requires numpy")
+class TestSolveBatch(unittest.TestCase):
+    diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def setUp(self):
+        rng = random.Random(0)
+        solved = values2grid(solution.solve(self.diagonal_grid))
+        self.grids = [self.diagonal_grid, '22' + '.' * 79, '.' * 81]
+        for _ in range(20):
+            givens = set(rng.sample(range(81), rng.randint(20, 40)))
+            self.grids.append(''.join(solved[i] if i in givens else '.' for i in range(81)))
+
+    def test_grid_round_trip(self):
+        cand = vectorized.grids2tensor(self.grids, solution.tables)
+        self.assertEqual(cand.shape, (len(self.grids), 81, 9))
+        self.assertEqual(vectorized.tensor2grids(cand, solution.tables), self.grids)
+
+    def test_matches_search(self):
+        results = vectorized.solve_batch(self.grids, solution.tables)
+        for grid, result in zip(self.grids, results):
+            expected = solution.solve(grid)
+            if expected is False:
+                self.assertFalse(result)
+            else:
+                # puzzles with several solutions may be completed differently
+                self.assertEqual(solution.solve(result), bitboard.bits2values(
+                    bitboard.grid2bits(result, solution.tables), solution.tables))
+                self.assertTrue(all(val in ('.', res) for val, res in zip(grid, result)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,128 @@
 
-from collections import defaultdict
+from array import array
+from collections import defaultdict, namedtuple
+from functools import lru_cache
 
 
 rows = 'ABCDEFGHI'
 cols = '123456789'
 boxes = [r + c for r in rows for c in cols]
-history = {}  # history must be declared here so that it exists in the assign_values scope
+
+_BOX_INDEX = {box: i for i, box in enumerate(boxes)}
+
+# Larger boards label rows with letters and columns with numbers (e.g., "P16"),
+# and use these symbols (in order) as the digits, so a 16x16 grid string uses
+# '123456789ABCDEFG' and '.' for empty boxes
+ROW_LABELS = 'ABCDEFGHIJKLMNOPQRSTUVWXY'
+SYMBOLS = '123456789ABCDEFGHIJKLMNOP'
+
+Board = namedtuple("Board", "n rows cols digits boxes unitlist units peers")
+
+# assign_value() only records history when it will be used (see set_history_mode)
+HISTORY_MODES = ('off', 'solve', 'ring')
+_history_mode = 'off'
+
+
+class History:
+    """The assignments recorded by assign_value(), stored as compact records
+
+    Each record holds the index of the assigned box, the assigned symbol, and
+    the id of the record that produced the board it was made on (its parent,
+    or -1), in three arrays. The hash of each board (as a grid string) is
+    mapped to the id of the latest record that produced it by an open
+    addressing hash table, also made of arrays, so that reconstruct() can
+    follow the parents back from the solution. This takes a small fraction
+    of the memory of storing the grid strings of every board in a dict.
+
+    Parameters
+    ----------
+    maxlen(int)
+        if given, only the most recent `maxlen` records are kept (in a ring
+        buffer); older records are dropped
+    """
+    def __init__(self, maxlen=None):
+        self.maxlen = maxlen
+        self.clear()
+
+    def clear(self):
+        """Discard every record"""
+        self.next_id = 0
+        self.box_index = array('B')
+        self.symbols = array('B')
+        self.parents = array('i')
+        self._table_keys = array('q')
+        self._table_ids = array('i')
+        self._resize()
+
+    def __len__(self):
+        return self.next_id - self.first_id
+
+    @property
+    def first_id(self):
+        """The id of the oldest record kept"""
+        return self.next_id - min(self.next_id, self.maxlen or self.next_id)
+
+    def add(self, parent_key, key, box, value):
+        """Record the assignment of `value` to `box`, which changed the board
+        with hash `parent_key` into the board with hash `key`"""
+        record = (_BOX_INDEX[box], ord(value), self.find(parent_key))
+        if self.maxlen is None or self.next_id < self.maxlen:
+            self.box_index.append(record[0])
+            self.symbols.append(record[1])
+            self.parents.append(record[2])
+        else:
+            slot = self.next_id % self.maxlen
+            self.box_index[slot], self.symbols[slot], self.parents[slot] = record
+        i = self._probe(key)
+        if self._table_ids[i] < 0:
+            self._used += 1
+        self._table_keys[i] = key
+        self._table_ids[i] = self.next_id
+        self.next_id += 1
+        if 3 * self._used > 2 * len(self._table_ids):
+            self._resize()
+
+    def find(self, key):
+        """Return the id of the latest record kept that produced the board with hash `key`, or -1"""
+        record_id = self._table_ids[self._probe(key)]
+        return record_id if record_id >= self.first_id else -1
+
+    def step(self, record_id):
+        """Return the (box, value) assignment of a record"""
+        slot = record_id % self.maxlen if self.maxlen else record_id
+        return boxes[self.box_index[slot]], chr(self.symbols[slot])
+
+    def parent(self, record_id):
+        """Return the id of the parent of a record, or -1"""
+        return self.parents[record_id % self.maxlen if self.maxlen else record_id]
+
+    def _probe(self, key):
+        """Return the table slot holding `key`, or the empty slot where it belongs (linear probing)"""
+        keys, ids = self._table_keys, self._table_ids
+        mask = len(ids) - 1
+        i = key & mask
+        while ids[i] >= 0 and keys[i] != key:
+            i = (i + 1) & mask
+        return i
+
+    def _resize(self):
+        """Rebuild the table at twice the size of its entries, dropping those of records no longer kept"""
+        first_id = self.first_id
+        entries = [(key, record_id) for key, record_id in zip(self._table_keys, self._table_ids)
+                   if record_id >= first_id]
+        size = 8
+        while size < 2 * len(entries):
+            size *= 2
+        self._table_keys = array('q', bytes(8 * size))
+        self._table_ids = array('i', [-1]) * size
+        self._used = len(entries)
+        for key, record_id in entries:
+            i = self._probe(key)
+            self._table_keys[i] = key
+            self._table_ids[i] = record_id
+
+
+history = History()  # history must be declared here so that it exists in the assign_values scope
 
 
 def extract_units(unitlist, boxes):
@@ -27,9 +144,11 @@ def extract_units(unitlist, boxes):
     """
     # the value for keys that aren't in the dictionary are initialized as an empty list
     units = defaultdict(list)
-    for current_box in boxes:
-        for unit in unitlist:
-            if current_box in unit:
+    members = set(boxes)
+    # visit each unit once instead of testing every box for membership in every unit
+    for unit in unitlist:
+        for current_box in unit:
+            if current_box in members:
                 # defaultdict avoids this raising a KeyError when new keys are added
                 units[current_box].append(unit)
     return units
@@ -66,10 +185,91 @@ def extract_peers(units, boxes):
     return peers
 
 
+@lru_cache(maxsize=None)
+def make_board(n=3, diagonal=False):
+    """Build (and cache) the boxes, units and peers of an (n^2 x n^2) Sudoku board
+
+    Parameters
+    ----------
+    n(int)
+        the size of the square units; n=3 is a standard 9x9 board, n=4 is 16x16
+        and n=5 is 25x25
+
+    diagonal(bool)
+        whether the two main diagonals are also units
+
+    Returns
+    -------
+    Board
+        a namedtuple with the square size, the row and column labels, the digit
+        symbols, the box names, the list of units, and the units and peers of
+        every box (see extract_units() and extract_peers())
+    """
+    size = n * n
+    if not 1 < size <= len(SYMBOLS):
+        raise ValueError("Unsupported board size: {0}x{0}".format(size))
+    board_rows = ROW_LABELS[:size]
+    board_cols = [str(c) for c in range(1, size + 1)]
+    board_boxes = cross(board_rows, board_cols)
+    row_units = [cross(r, board_cols) for r in board_rows]
+    column_units = [cross(board_rows, [c]) for c in board_cols]
+    square_units = [cross(board_rows[i:i + n], board_cols[j:j + n])
+                    for i in range(0, size, n) for j in range(0, size, n)]
+    unitlist = row_units + column_units + square_units
+    if diagonal:
+        unitlist += [[r + c for r, c in zip(board_rows, board_cols)],
+                     [r + c for r, c in zip(board_rows, board_cols[::-1])]]
+    units = extract_units(unitlist, board_boxes)
+    peers = extract_peers(units, board_boxes)
+    return Board(n, board_rows, board_cols, SYMBOLS[:size], board_boxes, unitlist, units, peers)
+
+
+def grid_board(grid, diagonal=False):
+    """Return the Board matching the length of a grid string (e.g., 256 for 16x16)"""
+    n = int(round(len(grid) ** 0.25))
+    if n ** 4 != len(grid):
+        raise ValueError("Grid length {} is not the size of a Sudoku board".format(len(grid)))
+    return make_board(n, diagonal)
+
+
+def set_history_mode(mode, maxlen=None):
+    """Choose how assign_value() records assignments for reconstruct()
+
+    Recording is off by default because converting the board to a grid string
+    twice per assignment dominates the solve time, and the history is only
+    needed to visualize a solution.
+
+    Parameters
+    ----------
+    mode(string)
+        'off' to stop recording, 'solve' to record every assignment of the
+        current solve (the history is cleared by start_history()), or 'ring'
+        to keep only the most recent `maxlen` assignments
+
+    maxlen(int)
+        the number of assignments kept in 'ring' mode
+    """
+    global _history_mode
+    if mode not in HISTORY_MODES:
+        raise ValueError("Unknown history mode: {!r}".format(mode))
+    if mode == 'ring' and not maxlen:
+        raise ValueError("'ring' history mode requires a positive maxlen")
+    _history_mode = mode
+    history.maxlen = maxlen if mode == 'ring' else None
+    history.clear()
+
+
+def start_history():
+    """Discard the assignments recorded by a previous solve in 'solve' mode"""
+    if _history_mode == 'solve':
+        history.clear()
+
+
 def assign_value(values, box, value):
     """You must use this function to update your values dictionary if you want to
     try using the provided visualization tool. This function records each assignment
-    (in order) for later reconstruction.
+    (in order) for later reconstruction when recording is enabled with
+    set_history_mode().
 
     Parameters
     ----------
@@ -79,16 +279,19 @@ def assign_value(values, box, value):
     Returns
     -------
     dict
-        The values dictionary with the naked twins eliminated from peers
+        The values dictionary with the new value assigned to the box
     """
     # Don't waste memory appending actions that don't actually change any values
     if values[box] == value:
         return values
 
-    prev = values2grid(values)
+    if _history_mode == 'off' or len(value) != 1:
+        values[box] = value
+        return values
+
+    prev = hash(values2grid(values))
     values[box] = value
-    if len(value) == 1:
-        history[values2grid(values)] = (prev, (box, value))
+    history.add(prev, hash(values2grid(values)), box, value)
     return values
 
 def cross(A, B):
@@ -96,7 +299,7 @@ def cross(A, B):
     return [x+y for x in A for y in B]
 
 
-def values2grid(values):
+def values2grid(values, board=None):
     """Convert the dictionary board representation to as string
 
     Parameters
@@ -104,6 +307,9 @@ def values2grid(values):
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
+    board(Board)
+        the board returned by make_board() for boards other than 9x9
+
     Returns
     -------
     a string representing a sudoku grid.
@@ -111,14 +317,13 @@ def values2grid(values):
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
     """
     res = []
-    for r in rows:
-        for c in cols:
-            v = values[r + c]
-            res.append(v if len(v) == 1 else '.')
+    for box in (boxes if board is None else board.boxes):
+        v = values[box]
+        res.append(v if len(v) == 1 else '.')
     return ''.join(res)
 
 
-def grid2values(grid):
+def grid2values(grid, board=None):
     """Convert grid into a dict of {square: char} with '123456789' for empties.
 
     Parameters
@@ -127,6 +332,10 @@ def grid2values(grid):
         a string representing a sudoku grid.
         
         Ex. '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    board(Board)
+        the board returned by make_board() for boards other than 9x9 (empty
+        boxes then hold every symbol in board.digits)
     
     Returns
     -------
@@ -135,53 +344,64 @@ def grid2values(grid):
             Values: The value in each box, e.g., '8'. If the box has no value,
             then the value will be '123456789'.
     """
+    board_boxes, digits = (boxes, cols) if board is None else (board.boxes, board.digits)
     sudoku_grid = {}
-    for val, key in zip(grid, boxes):
+    for val, key in zip(grid, board_boxes):
         if val == '.':
-            sudoku_grid[key] = '123456789'
+            sudoku_grid[key] = digits
         else:
             sudoku_grid[key] = val
     return sudoku_grid
 
 
-def display(values):
+def display(values, board=None):
     """Display the values as a 2-D grid.
 
     Parameters
     ----------
         values(dict): The sudoku in dictionary form
+
+        board(Board): the board returned by make_board() for boards other than 9x9
     """
-    width = 1+max(len(values[s]) for s in boxes)
-    line = '+'.join(['-'*(width*3)]*3)
-    for r in rows:
-        print(''.join(values[r+c].center(width)+('|' if c in '36' else '')
-                      for c in cols))
-        if r in 'CF': print(line)
+    if board is None:
+        board = make_board(3)
+    n, board_rows, board_cols = board.n, board.rows, board.cols
+    width = 1+max(len(values[s]) for s in board.boxes)
+    line = '+'.join(['-'*(width*n)]*n)
+    for i, r in enumerate(board_rows):
+        print(''.join(values[r+c].center(width)+('|' if j % n == n - 1 and j < len(board_cols) - 1 else '')
+                      for j, c in enumerate(board_cols)))
+        if i % n == n - 1 and i < len(board_rows) - 1: print(line)
     print()
 
 
 def reconstruct(values, history):
-    """Returns the solution as a sequence of value assignments 
+    """Yields the solution as a sequence of value assignments
 
     Parameters
     ----------
     values(dict)
         a dictionary of the form {'box_name': '123456789', ...}
 
-    history(dict)
-        a dictionary of the form {key: (key, (box, value))} encoding a linked
-        list where each element points to the parent and identifies the value
-        assignment that connects from the parent to the current state
+    history(History)
+        the records of the assignments made by assign_value(), where each
+        record points to its parent, encoding a linked list from the
+        solution back to the starting puzzle (or to the oldest record kept)
 
-    Returns
-    -------
-    list
-        a list of (box, value) assignments that can be applied in order to the
+    Yields
+    ------
+    tuple
+        the (box, value) assignments that can be applied in order to the
         starting Sudoku puzzle to reach the solution
     """
-    path = []
-    prev = values2grid(values)
-    while prev in history:
-        prev, step = history[prev]
-        path.append(step)
-    return path[::-1]
+    first_id = history.first_id
+    # mark the records on the path to the solution, then yield them in the
+    # order they were recorded (parents are always recorded before children)
+    on_path = bytearray(len(history))
+    record_id = history.find(hash(values2grid(values)))
+    while record_id >= first_id:
+        on_path[record_id - first_id] = 1
+        record_id = history.parent(record_id)
+    for offset, marked in enumerate(on_path):
+        if marked:
+            yield history.step(first_id + offset)
@@ -0,0 +1,147 @@
+"""Vectorized constraint propagation for batches of Sudoku puzzles with NumPy
+
+A batch of B puzzles is held as a (B, boxes, digits) boolean array, where
+cand[b, i, k] is True if the k-th digit symbol is still a candidate for box i
+of puzzle b. The eliminate and only choice strategies are applied to every
+board in the batch at once as array operations (the peer and unit
+relationships are encoded as 0/1 matrices so the per-box sums become matrix
+products). Boards that are not solved by propagation alone fall back to the
+bitmask search in bitboard.py.
+
+Examples
+--------
+>>> from solution import tables
+>>> solutions = solve_batch(grids, tables)
+"""
+import numpy as np
+
+import bitboard
+
+
+def _kernel_arrays(tables):
+    """Encode the peers and units of the board as arrays for the kernel"""
+    n_boxes = len(tables.boxes)
+    peers = np.zeros((n_boxes, n_boxes), dtype=np.float32)
+    for i, box_peers in enumerate(tables.peers):
+        peers[i, list(box_peers)] = 1
+    # all units of the standard boards have the same size, so they can be
+    # gathered into a single (units, unit size) index array
+    unit_index = np.array(tables.units, dtype=np.intp)
+    # members[i, k] is 1 if the k-th entry of the flattened unit_index is box i
+    members = np.zeros((n_boxes, unit_index.size), dtype=np.float32)
+    members[unit_index.ravel(), np.arange(unit_index.size)] = 1
+    return peers, unit_index, members
+
+
+def _box_product(matrix, cand):
+    """Compute matrix @ cand[b] for every board b as a single matrix product"""
+    # tensordot flattens the batch and digit axes into one (B * digits) axis
+    return np.tensordot(matrix, cand.astype(np.float32), axes=([1], [1])).transpose(1, 0, 2)
+
+
+def grids2tensor(grids, tables):
+    """Convert a sequence of grid strings to a (B, boxes, digits) candidate array
+
+    Parameters
+    ----------
+    grids(list)
+        a list of strings representing sudoku grids (see utils.grid2values())
+
+    tables(Tables)
+        the index tables returned by bitboard.build_tables()
+
+    Returns
+    -------
+    numpy.ndarray
+        a boolean array of shape (len(grids), boxes, digits)
+    """
+    n_boxes, n_digits = len(tables.boxes), len(tables.digits)
+    lookup = np.full(256, -1, dtype=np.int16)
+    lookup[np.frombuffer(tables.digits.encode(), dtype=np.uint8)] = np.arange(n_digits)
+    symbols = np.frombuffer(''.join(grids).encode(), dtype=np.uint8).reshape(len(grids), n_boxes)
+    index = lookup[symbols]
+    return (index[..., None] == np.arange(n_digits)) | (index[..., None] < 0)
+
+
+def tensor2grids(cand, tables):
+    """Convert a candidate array to grid strings ('.' for unsolved boxes)"""
+    symbols = np.frombuffer(('.' + tables.digits).encode(), dtype=np.uint8)
+    index = np.where(cand.sum(-1) == 1, cand.argmax(-1) + 1, 0)
+    return [row.tobytes().decode() for row in symbols[index]]
+
+
+def propagate_batch(cand, tables):
+    """Apply eliminate and only choice to every board until none of them change
+
+    Parameters
+    ----------
+    cand(numpy.ndarray)
+        a boolean array of shape (B, boxes, digits); it is modified in place
+
+    tables(Tables)
+        the index tables returned by bitboard.build_tables()
+
+    Returns
+    -------
+    numpy.ndarray
+        a boolean array of shape (B,) that is True for the boards found to be
+        unsolvable
+    """
+    peers, unit_index, members = _kernel_arrays(tables)
+    n_units, unit_size = unit_index.shape
+    failed = np.zeros(len(cand), dtype=bool)
+    active = np.arange(len(cand))
+    while active.size:
+        board = cand[active]
+        before = board.copy()
+
+        # eliminate: remove the digits of solved peers
+        solved = board & (board.sum(-1, keepdims=True) == 1)
+        board &= ~(_box_product(peers, solved) > 0)
+
+        # only choice: assign digits that fit in only one box of a unit
+        in_units = board[:, unit_index, :]
+        counts = in_units.sum(2)
+        hidden = in_units & (counts == 1)[:, :, None, :]
+        hidden = _box_product(members, hidden.reshape(len(board), n_units * unit_size, -1)) > 0
+        has_hidden = hidden.any(-1, keepdims=True)
+        board = np.where(has_hidden, hidden, board)
+
+        bad = (counts == 0).any((1, 2)) | (hidden.sum(-1) > 1).any(-1) | (~board.any(-1)).any(-1)
+        cand[active] = board
+        failed[active[bad]] = True
+        changed = (board != before).any((1, 2))
+        active = active[changed & ~bad]
+    return failed
+
+
+def solve_batch(grids, tables):
+    """Solve a batch of puzzles with the vectorized kernel and bitmask search
+
+    Parameters
+    ----------
+    grids(list)
+        a list of strings representing sudoku grids (see utils.grid2values())
+
+    tables(Tables)
+        the index tables returned by bitboard.build_tables()
+
+    Returns
+    -------
+    list
+        the solved grid string for each puzzle, or False if it has no solution
+    """
+    grids = list(grids)
+    if not grids:
+        return []
+    cand = grids2tensor(grids, tables)
+    failed = propagate_batch(cand, tables)
+    results = tensor2grids(cand, tables)
+    weights = 1 << np.arange(len(tables.digits), dtype=np.int64)
+    for b, grid in enumerate(results):
+        if failed[b]:
+            results[b] = False
+        elif '.' in grid:
+            bits = bitboard.search((cand[b] * weights).sum(-1).tolist(), tables)
+            results[b] = bits and bitboard.bits2grid(bits, tables)
+    return results
@@ -67,6 +67,19 @@ class TimedQueue:
     def start_timer(self):
         self.__stop_time = self.__time_limit + time.perf_counter()
 
+    @property
+    def time_limit(self):
+        """ The time limit of the turn in seconds """
+        return self.__time_limit
+
+    def time_left(self):
+        """ Return the seconds left before put() raises StopSearch, or None
+        if the timer has not started
+        """
+        if self.__stop_time is None:
+            return None
+        return self.__stop_time - time.perf_counter()
+
     def put(self, item, block=True, timeout=None):
         if self.__stop_time and time.perf_counter() > self.__stop_time:
             raise StopSearch
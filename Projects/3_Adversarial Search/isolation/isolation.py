@@ -3,6 +3,7 @@
 #                          DO NOT MODIFY THIS FILE                            #
 ###############################################################################
 from enum import IntEnum
+from random import Random
 from typing import NamedTuple
 
 
@@ -32,6 +33,45 @@ class Action(IntEnum):
     NNW = N+N+W  # north-northwest (up, up, left)
 
 _ACTIONSET = set(Action)  # used for efficient membership testing
+_ACTION_OFFSETS = {int(a): a for a in Action}  # maps a move offset back to its Action
+
+# _MOVES[loc] is a bitboard with a one for each cell on the board that a
+# knight can reach from loc, so the open cells around loc are board & _MOVES[loc]
+_MOVES = tuple(sum(1 << (loc + a) for a in Action if loc + a >= 0 and _BLANK_BOARD & (1 << (loc + a)))
+               for loc in range(_SIZE))
+
+
+def _popcount(mask):
+    """ Return the number of ones in a bitboard """
+    return bin(mask).count("1")
+
+
+def _bits(mask):
+    """ Yield the index of each one in a bitboard, from the lowest """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# random 64-bit Zobrist keys for each blocked cell, for each player standing on
+# each cell, and for player 2 to move; the zobrist key of a state is the XOR of
+# the keys of its features (see Isolation.zobrist)
+_zobrist_rng = Random(0x15014710)
+_ZOBRIST_BLOCKED = tuple(_zobrist_rng.getrandbits(64) for _ in range(_SIZE))
+_ZOBRIST_LOCS = tuple(tuple(_zobrist_rng.getrandbits(64) for _ in range(_SIZE)) for _ in range(2))
+_ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+
+
+def _zobrist_key(board, ply_count, locs):
+    """ Compute the Zobrist key of a state from scratch """
+    key = _ZOBRIST_SIDE if ply_count % 2 else 0
+    for cell in _bits(_BLANK_BOARD & ~board):
+        key ^= _ZOBRIST_BLOCKED[cell]
+    for player_id, loc in enumerate(locs):
+        if loc is not None:
+            key ^= _ZOBRIST_LOCS[player_id][loc]
+    return key
 
 
 class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('locs', int)])):
@@ -59,6 +99,24 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
     def __new__(cls, board=_BLANK_BOARD, ply_count=0, locs=(None, None)):
         return super(Isolation, cls).__new__(cls, board, ply_count, locs)
 
+    @property
+    def zobrist(self):
+        """ A 64-bit Zobrist key of the state, for transposition tables
+
+        The key is the XOR of a random key for each blocked cell, for the
+        location of each player, and for the side to move. result() updates
+        the key of the parent state incrementally; the key of any other state
+        is computed on first use and cached on the instance.
+
+        Unlike hash(state), equal keys do not guarantee equal states, but
+        a collision between two different states is very unlikely.
+        """
+        try:
+            return self.__dict__['_zobrist']
+        except KeyError:
+            key = self.__dict__['_zobrist'] = _zobrist_key(self.board, self.ply_count, self.locs)
+            return key
+
     def actions(self):
         """ Return a list of the legal actions in the current state
 
@@ -110,7 +168,14 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
         # update the board to block the ending cell from the new move
         board = self.board ^ (1 << player_location)
         locs = (self.locs[0], player_location) if self.player() else (player_location, self.locs[1])
-        return Isolation(board=board, ply_count=self.ply_count + 1, locs=locs)
+        state = Isolation(board=board, ply_count=self.ply_count + 1, locs=locs)
+        # update the zobrist key for the blocked cell, the moved player and the side to move
+        player_keys = _ZOBRIST_LOCS[self.player()]
+        key = self.zobrist ^ _ZOBRIST_BLOCKED[player_location] ^ player_keys[player_location] ^ _ZOBRIST_SIDE
+        if self.locs[self.player()] is not None:
+            key ^= player_keys[self.locs[self.player()]]
+        state.__dict__['_zobrist'] = key
+        return state
 
     def terminal_test(self):
         """ Return True if either player has no legal moves, otherwise False
@@ -168,6 +233,49 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
         cells = range(_SIZE) if loc is None else (loc + a for a in Action)
         return [c for c in cells if c >= 0 and self.board & (1 << c)]
 
+    def liberty_mask(self, loc):
+        """ Return a bitboard of the open cells in the neighborhood of `loc`
+
+        This is the bitboard version of liberties(): bit c is set if c is
+        one of the liberties of `loc` (every open cell if `loc` is None).
+
+        Parameters
+        ----------
+        loc : int
+            A position on the current board to use as the anchor point for
+            available liberties
+
+        Returns
+        -------
+        int
+            A bitboard of the open liberties of the starting position
+        """
+        return self.board if loc is None else self.board & _MOVES[loc]
+
+    def count_liberties(self, loc):
+        """ Return the number of liberties of `loc`, i.e., len(self.liberties(loc)) """
+        return _popcount(self.liberty_mask(loc))
+
+    def iter_liberties(self, loc):
+        """ Yield the position of each open liberty of `loc` (in increasing order)
+
+        See Also
+        -------
+            Isolation.liberties()
+        """
+        return _bits(self.liberty_mask(loc))
+
+    def iter_actions(self):
+        """ Yield the legal actions in the current state without building a list
+
+        The actions are the same as the ones returned by actions(), but in
+        order of increasing target cell rather than in Action order.
+        """
+        loc = self.locs[self.player()]
+        if loc is None:
+            return _bits(self.board)
+        return (_ACTION_OFFSETS[c - loc] for c in _bits(self.board & _MOVES[loc]))
+
     def _has_liberties(self, player_id):
         """ Return True if the player has any legal moves in the given state
 
@@ -175,7 +283,7 @@ class Isolation(NamedTuple('Isolation', [('board', int), ('ply_count', int), ('l
         -------
             Isolation.liberties()
         """
-        return any(self.liberties(self.locs[player_id]))
+        return bool(self.liberty_mask(self.locs[player_id]))
 
 
 class DebugState(Isolation):
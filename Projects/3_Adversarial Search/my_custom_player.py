@@ -1,7 +1,122 @@
 
+import time
+
+from array import array
+from collections import namedtuple
+from operator import attrgetter
+
+from isolation import Isolation
 from sample_players import DataPlayer
 
 
+# only this file is submitted for grading, where it runs with the stock
+# isolation package, so use the bitboard methods of Isolation when they exist
+if hasattr(Isolation, "count_liberties"):
+    def count_liberties(state, loc):
+        """ Return the number of liberties of `loc`, i.e., len(state.liberties(loc)) """
+        return state.count_liberties(loc)
+else:
+    def count_liberties(state, loc):
+        """ Return the number of liberties of `loc`, i.e., len(state.liberties(loc)) """
+        return len(state.liberties(loc))
+
+if hasattr(Isolation, "zobrist"):
+    def state_key(state):
+        """ Return the 64-bit key of a state in the transposition table """
+        return state.zobrist
+else:
+    def state_key(state):
+        """ Return the 64-bit key of a state in the transposition table """
+        # hash(None) can differ between processes, so hash integers only;
+        # the key must be the same in the next turn (see SearchContext)
+        locs = tuple(-1 if loc is None else loc for loc in state.locs)
+        return hash((state.board, state.ply_count) + locs) & 0xFFFFFFFFFFFFFFFF
+
+
+# bound types of the values in the transposition table: the exact minimax
+# value, or a lower/upper bound from a search that failed high/low
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# the move saved by TranspositionTable.dump() for entries without a best move
+_NO_MOVE = -128
+
+TableEntry = namedtuple("TableEntry", "key depth value bound move")
+
+# what the player passes to its next turn in self.context: the deepest table
+# entries (see TranspositionTable.dump()), the Zobrist key of the state the
+# principal variation predicts for the next turn, and the rest of the
+# principal variation from that state
+SearchContext = namedtuple("SearchContext", "entries pv_key pv")
+
+
+class TranspositionTable:
+    """ Fixed-size table of search results keyed by the Zobrist key of a state
+
+    Each bucket has two slots: a depth-preferred slot that only gives way to
+    a search at least as deep, and an always-replace slot for everything else,
+    so deep (expensive) results survive while recent ones are still kept.
+
+    Attributes
+    ----------
+    hits: int
+        number of lookups that found an entry for the key
+
+    misses: int
+        number of lookups that found nothing
+    """
+    def __init__(self, buckets=1 << 16):
+        self.mask = buckets - 1
+        assert buckets & self.mask == 0, "the number of buckets must be a power of two"
+        self.slots = [None] * (2 * buckets)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """ Return the TableEntry stored for the key, or None """
+        i = (key & self.mask) << 1
+        entry = self.slots[i]
+        if entry is None or entry.key != key:
+            entry = self.slots[i + 1]
+            if entry is None or entry.key != key:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, value, bound, move):
+        """ Save the result of searching a state `depth` plies deep """
+        i = (key & self.mask) << 1
+        preferred = self.slots[i]
+        if preferred is None or preferred.key == key or depth >= preferred.depth:
+            self.slots[i] = TableEntry(key, depth, value, bound, move)
+        else:
+            self.slots[i + 1] = TableEntry(key, depth, value, bound, move)
+
+    def dump(self, limit):
+        """ Return the `limit` deepest entries packed into compact arrays
+
+        Deep entries are the most expensive to recompute, and they are
+        the states closest to the root, which the next turn will search
+        again. The arrays pickle as raw bytes (about 19 bytes per entry),
+        so they are cheap to send between processes.
+        """
+        # (sorting everything is faster than heapq.nlargest() for tables this size)
+        entries = sorted(filter(None, self.slots), key=attrgetter("depth"), reverse=True)[:limit]
+        return (array("Q", [e.key for e in entries]),
+                bytes([e.depth for e in entries]),
+                array("f", [e.value for e in entries]),
+                bytes([e.bound for e in entries]),
+                array("b", [_NO_MOVE if e.move is None else e.move for e in entries]))
+
+    def load(self, packed):
+        """ Store the entries packed by dump() """
+        for key, depth, value, bound, move in zip(*packed):
+            self.store(key, depth, value, bound, None if move == _NO_MOVE else move)
+
+    def __len__(self):
+        return sum(entry is not None for entry in self.slots)
+
+
 class CustomPlayer(DataPlayer):
 
     """ Implement your own agent to play knight's Isolation
@@ -20,6 +135,31 @@ class CustomPlayer(DataPlayer):
       any pickleable object to the self.context attribute.
     **********************************************************************
     """
+    TABLE_BUCKETS = 1 << 14  # size of the transposition table (two entries per bucket)
+    CONTEXT_ENTRIES = 1024  # most table entries passed to the next turn in self.context
+    PRINCIPAL_VARIATION_SEARCH = True  # search moves after the first with a null window first
+    ASPIRATION_WINDOW = 1  # half-width of the root window around the last value (None for a full window)
+    CLOCK_INTERVAL = 128  # number of nodes searched between checks of the hard deadline
+
+    def __init__(self, player_id):
+        super().__init__(player_id)
+        self.table = None
+        self.pv = ()
+        self.score = None
+        self.killers = {}
+        self.history = {}
+        self.nodes = 0
+
+    if not hasattr(DataPlayer, "check_time"):
+        # the stock sample_players.py has no clock: keep deepening until
+        # the caller cuts off the search
+        def check_time(self):
+            """ Do nothing; the caller enforces the time limit """
+
+        def should_deepen(self, iteration_time, branching_factor):
+            """ Always search the next depth """
+            return True
+
     def get_action(self, state):
         """ Employ an adversarial search technique to choose an action
         available in the current state calls self.queue.put(ACTION) at least
@@ -37,18 +177,38 @@ class CustomPlayer(DataPlayer):
           Refer to (and use!) the Isolation.play() function to run games.
         **********************************************************************
         """
-        # TODO: Replace the example implementation below with your own search
-        #       method by combining techniques from lecture
-        #
-        # EXAMPLE: choose a random move without any search--this function MUST
-        #          call self.queue.put(ACTION) at least once before time expires
-        #          (the timer is automatically managed for you)
-        depth_limit = 1
-        while True:
+        actions = state.actions()
+        if not actions or state.terminal_test():
+            # nothing to search: either no move is legal or any move wins
+            self.queue.put(actions[0] if actions else None)
+            return
+
+        self.table = TranspositionTable(self.TABLE_BUCKETS)
+        self.pv = ()
+        self.score = None
+        self.killers = {}
+        self.history = {}
+        if self.context is not None:
+            # start from the results of the previous turn
+            self.table.load(self.context.entries)
+            if self.context.pv_key == state_key(state):
+                self.pv = self.context.pv
+        # the game cannot last longer than the number of open cells, so
+        # deeper searches would only repeat the last one
+        last_nodes = 0
+        for depth_limit in range(1, count_liberties(state, None) + 1):
+            start_time, start_nodes = time.perf_counter(), self.nodes
             choice = self.alpha_beta_search(state, depth_limit=depth_limit)
+            # the queue sends the context along with the action, so it must be set first
+            self.context = self.search_context(state, depth_limit)
             self.queue.put(choice)
 
-            depth_limit += 1
+            # stop if the next iteration is not expected to finish in time
+            nodes = self.nodes - start_nodes
+            branching_factor = max(1, nodes / last_nodes) if last_nodes else 1
+            if not self.should_deepen(time.perf_counter() - start_time, branching_factor):
+                break
+            last_nodes = nodes
 
 
     def alpha_beta_search(self, gameState, depth_limit):
@@ -57,64 +217,225 @@ class CustomPlayer(DataPlayer):
         in (column, row) order corresponding to a legal move for
         the searching player.
 
-        You can ignore the special case of calling this function
-        from a terminal state.
+        With ASPIRATION_WINDOW, the search first uses a narrow window
+        around the value of the previous (shallower) search, and only
+        searches again with the full window if the value is outside it.
+        The value of the search is saved in self.score.
+
+        If every move loses, the first legal move is returned.
         """
-        alpha = float("-inf")
-        beta = float("inf")
+        if self.ASPIRATION_WINDOW and self.score not in (None, float("inf"), float("-inf")):
+            alpha, beta = self.score - self.ASPIRATION_WINDOW, self.score + self.ASPIRATION_WINDOW
+            score, best_move = self._search_root(gameState, alpha, beta, depth_limit)
+            if alpha < score < beta:
+                self.score = score
+                return best_move
+        self.score, best_move = self._search_root(gameState, float("-inf"), float("inf"), depth_limit)
+        return best_move
+
+    def _search_root(self, gameState, alpha, beta, depth_limit):
+        """ Return the value (or a bound on it outside (alpha, beta)) and the best move of the root """
+        window = alpha, beta
         best_score = float("-inf")
-        best_move = None
-        for a in gameState.actions():
-            v = self.min_value(gameState.result(a), alpha, beta, depth_limit=depth_limit, depth=1)
+        entry = self.table.lookup(state_key(gameState))
+        first = entry.move if entry is not None else (self.pv[0] if self.pv else None)
+        actions = self._ordered_actions(gameState, first)
+        best_move = actions[0] if actions else None
+        for i, a in enumerate(actions):
+            null_window = self._null_window(alpha, beta, maximizing=True) if i else None
+            v = self._search_child(self.min_value, gameState.result(a), alpha, beta, null_window, depth_limit, 1)
             if v > best_score:
                 best_score = v
                 best_move = a
-                alpha = v
-        return best_move
+            if v >= beta:
+                break
+            alpha = max(v, alpha)
+        self._save(state_key(gameState), depth_limit, best_score, window, best_move)
+        return best_score, best_move
+
+    def principal_variation(self, gameState, max_length):
+        """ Return the sequence of best moves from a state stored in the transposition table """
+        pv = []
+        while len(pv) < max_length:
+            entry = self.table.lookup(state_key(gameState))
+            if entry is None or entry.move is None or entry.move not in gameState.actions():
+                break
+            pv.append(entry.move)
+            gameState = gameState.result(entry.move)
+        return pv
+
+    def search_context(self, state, depth_limit):
+        """ Return the SearchContext that passes the results of a search of `state` to the next turn """
+        pv = self.principal_variation(state, depth_limit)
+        pv_key = None
+        if len(pv) >= 2:
+            pv_key = state_key(state.result(pv[0]).result(pv[1]))
+        return SearchContext(self.table.dump(self.CONTEXT_ENTRIES), pv_key, tuple(pv[2:]))
 
-    # TODO: modify the function signature to accept an alpha and beta parameter
     def min_value(self, gameState, alpha, beta, depth_limit, depth=0):
-        """ Return the value for a win (+1) if the game is over,
-        otherwise return the minimum value over all legal child
-        nodes.
+        """ Return the value for a win (+inf) or loss (-inf) if the game is
+        over, otherwise return the minimum value over all legal child
+        nodes (a bound on it if the value is outside (alpha, beta)).
         """
+        self.nodes += 1
+        if self.nodes % self.CLOCK_INTERVAL == 0:
+            self.check_time()
         if gameState.terminal_test():
-            return gameState.utility(0)
+            return gameState.utility(self.player_id)
 
         if depth >= depth_limit:
             return self.evaluation(gameState)
 
+        key = state_key(gameState)
+        value, alpha, beta, table_move = self._probe(key, depth_limit - depth, alpha, beta)
+        if value is not None:
+            return value
+
+        window = alpha, beta
         v = float("inf")
-        for a in gameState.actions():
-            v = min(v, self.max_value(gameState.result(a), alpha, beta, depth_limit, depth + 1))
+        best_move = None
+        for a in self._ordered_actions(gameState, table_move, depth):
+            null_window = self._null_window(alpha, beta, maximizing=False) if best_move is not None else None
+            child = self._search_child(self.max_value, gameState.result(a), alpha, beta, null_window,
+                                       depth_limit, depth + 1)
+            if best_move is None or child < v:
+                v, best_move = child, a
             if v <= alpha:
-                return v
+                self._record_cutoff(gameState, a, depth, depth_limit - depth)
+                break
             beta = min(v, beta)
+        self._save(key, depth_limit - depth, v, window, best_move)
         return v
 
-    # TODO: modify the function signature to accept an alpha and beta parameter
     def max_value(self, gameState, alpha, beta, depth_limit, depth=0):
-        """ Return the value for a loss (-1) if the game is over,
-        otherwise return the maximum value over all legal child
-        nodes.
+        """ Return the value for a win (+inf) or loss (-inf) if the game is
+        over, otherwise return the maximum value over all legal child
+        nodes (a bound on it if the value is outside (alpha, beta)).
         """
+        self.nodes += 1
+        if self.nodes % self.CLOCK_INTERVAL == 0:
+            self.check_time()
         if gameState.terminal_test():
-            return gameState.utility(0)
+            return gameState.utility(self.player_id)
 
         if depth >= depth_limit:
             return self.evaluation(gameState)
 
+        key = state_key(gameState)
+        value, alpha, beta, table_move = self._probe(key, depth_limit - depth, alpha, beta)
+        if value is not None:
+            return value
+
+        window = alpha, beta
         v = float("-inf")
-        for a in gameState.actions():
-            v = max(v, self.min_value(gameState.result(a), alpha, beta, depth_limit, depth + 1))
+        best_move = None
+        for a in self._ordered_actions(gameState, table_move, depth):
+            null_window = self._null_window(alpha, beta, maximizing=True) if best_move is not None else None
+            child = self._search_child(self.min_value, gameState.result(a), alpha, beta, null_window,
+                                       depth_limit, depth + 1)
+            if best_move is None or child > v:
+                v, best_move = child, a
             if v >= beta:
-                return v
+                self._record_cutoff(gameState, a, depth, depth_limit - depth)
+                break
             alpha = max(v, alpha)
+        self._save(key, depth_limit - depth, v, window, best_move)
         return v
 
-    def evaluation(self, gameState):
-        my_position = gameState.locs[0]
-        opponent_position = gameState.locs[1]
+    def _null_window(self, alpha, beta, maximizing):
+        """ Return the null window for searching a move after the first, or None to use (alpha, beta)
+
+        The null window of a max node is (alpha, alpha + 1), which only
+        tests whether the move is better than the best so far (the values
+        of the evaluation are integers); for a min node it is (beta - 1, beta).
+        """
+        if not self.PRINCIPAL_VARIATION_SEARCH:
+            return None
+        if maximizing:
+            return (alpha, alpha + 1) if alpha != float("-inf") and alpha + 1 < beta else None
+        return (beta - 1, beta) if beta != float("inf") and alpha < beta - 1 else None
 
-        return len(gameState.liberties(my_position)) - len(gameState.liberties(opponent_position))
+    def _search_child(self, search, gameState, alpha, beta, null_window, depth_limit, depth):
+        """ Return the value of a child state from search() (min_value or max_value)
+
+        With a null window (principal variation search), the child is first
+        searched with the null window, which is much cheaper and is enough
+        to show that the value is outside (alpha, beta); it is only searched
+        again with the full window when the value is inside.
+        """
+        if null_window is not None:
+            value = search(gameState, null_window[0], null_window[1], depth_limit, depth)
+            if not alpha < value < beta:
+                return value
+        return search(gameState, alpha, beta, depth_limit, depth)
+
+    def _probe(self, key, depth, alpha, beta):
+        """ Look up a state in the transposition table before searching it
+
+        Returns the stored value if it settles the search of the state with
+        the (alpha, beta) window (otherwise None), the window narrowed by any
+        stored bound, and the best move stored for the state (or None).
+        """
+        entry = self.table.lookup(key)
+        if entry is None:
+            return None, alpha, beta, None
+        if entry.depth >= depth:
+            if entry.bound == EXACT:
+                return entry.value, alpha, beta, entry.move
+            if entry.bound == LOWER:
+                alpha = max(alpha, entry.value)
+            else:
+                beta = min(beta, entry.value)
+            if alpha >= beta:
+                return entry.value, alpha, beta, entry.move
+        return None, alpha, beta, entry.move
+
+    def _ordered_actions(self, gameState, first=None, depth=0):
+        """ Return the legal actions in the order they should be searched
+
+        The best move of a shallower search (`first`) comes first, then the
+        killer moves of the ply, then the other actions by their history
+        score (see _record_cutoff()), which all prune the most branches.
+        """
+        actions = gameState.actions()
+        player = gameState.player()
+        loc = gameState.locs[player]
+        history = self.history
+        if history:
+            actions.sort(key=lambda a: history.get((player, a, loc), 0), reverse=True)
+        for move in reversed((first,) + tuple(self.killers.get(depth, ()))):
+            if move is not None and move in actions:
+                # move the legal action itself, since `move` may be a plain int from the context
+                actions.insert(0, actions.pop(actions.index(move)))
+        return actions
+
+    def _record_cutoff(self, gameState, action, depth, draft):
+        """ Remember an action that caused a cutoff `depth` plies from the root
+
+        The action becomes a killer move, tried early in the other states
+        at the same ply, and its history score grows with the square of
+        the remaining search depth (cutoffs close to the root save more).
+        """
+        killers = self.killers.setdefault(depth, [None, None])
+        if killers[0] != action:
+            killers[1], killers[0] = killers[0], action
+        player = gameState.player()
+        key = (player, action, gameState.locs[player])
+        self.history[key] = self.history.get(key, 0) + draft * draft
+
+    def _save(self, key, depth, value, window, move):
+        """ Store a search result with the bound type implied by the (alpha, beta) window it was searched with """
+        alpha, beta = window
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, depth, value, bound, move)
+
+    def evaluation(self, gameState):
+        my_position = gameState.locs[self.player_id]
+        opponent_position = gameState.locs[1 - self.player_id]
 
+        return count_liberties(gameState, my_position) - count_liberties(gameState, opponent_position)
@@ -5,10 +5,22 @@ import logging
 import pickle
 import random
 
+from isolation import StopSearch
+
 logger = logging.getLogger(__name__)
 
 
 class BasePlayer:
+    """ Base class of the agents
+
+    The clock methods let a search manage its own time: the hard deadline is
+    the end of the turn, when self.queue stops accepting actions, and the soft
+    deadline (SOFT_DEADLINE of the time limit) is the last moment to start a
+    new iteration of an iterative deepening search. Without a timed queue
+    (e.g., when get_action() is called directly) the turn never ends.
+    """
+    SOFT_DEADLINE = 0.8  # fraction of the time limit
+
     def __init__(self, player_id):
         self.player_id = player_id
         self.timer = None
@@ -16,6 +28,54 @@ class BasePlayer:
         self.context = None
         self.data = None
 
+    def time_left(self):
+        """ Return the seconds left before the hard deadline (inf if the turn is not timed) """
+        time_left = getattr(self.queue, "time_left", None)
+        seconds = time_left() if time_left else None
+        return float("inf") if seconds is None else seconds
+
+    def time_used(self):
+        """ Return the seconds since the start of the turn (0 if the turn is not timed) """
+        seconds = self.time_left()
+        return 0 if seconds == float("inf") else self.queue.time_limit - seconds
+
+    def soft_deadline_passed(self):
+        """ Return True if it is too late to start another iteration of search """
+        if self.time_left() == float("inf"):
+            return False
+        return self.time_used() >= self.SOFT_DEADLINE * self.queue.time_limit
+
+    def check_time(self):
+        """ Raise StopSearch if the hard deadline has passed
+
+        Call this regularly during search: no action can be sent after the
+        deadline, so the search should stop instead of running until the
+        process is terminated.
+        """
+        if self.time_left() <= 0:
+            raise StopSearch
+
+    def predict_iteration_time(self, iteration_time, branching_factor):
+        """ Return the expected time of the next iteration of iterative deepening
+
+        Parameters
+        ----------
+        iteration_time : float
+            The seconds taken by the last iteration
+
+        branching_factor : float
+            The effective branching factor of the search, e.g., the ratio of
+            the nodes searched by the last two iterations
+        """
+        return iteration_time * branching_factor
+
+    def should_deepen(self, iteration_time, branching_factor):
+        """ Return True if the next iteration should start: the soft deadline has
+        not passed, and it is expected to finish before the hard deadline
+        """
+        return (not self.soft_deadline_passed()
+                and self.predict_iteration_time(iteration_time, branching_factor) < self.time_left())
+
     def get_action(self, state):
         """ Implement a function that calls self.queue.put(ACTION) within the allowed time limit 
 
@@ -0,0 +1,51 @@
+
+import unittest
+
+from random import Random
+
+from isolation import Isolation, DebugState
+from isolation.isolation import Action, _SIZE, _zobrist_key
+
+
+def random_states(seed, games):
+    """ Yield every state of some random games """
+    rng = Random(seed)
+    for _ in range(games):
+        state = Isolation()
+        yield state
+        while not state.terminal_test():
+            state = state.result(rng.choice(state.actions()))
+            yield state
+
+
+class BitboardLibertiesTest(unittest.TestCase):
+    def test_liberties_match_list_api(self):
+        """ liberty_mask(), count_liberties() and iter_liberties() agree with liberties() """
+        for state in random_states(0, 20):
+            for loc in state.locs + (None, 0, _SIZE - 1):
+                liberties = state.liberties(loc)
+                self.assertEqual(list(state.iter_liberties(loc)), sorted(liberties))
+                self.assertEqual(state.count_liberties(loc), len(liberties))
+                self.assertEqual(state.liberty_mask(loc), sum(1 << c for c in liberties))
+
+    def test_iter_actions_match_list_api(self):
+        """ iter_actions() yields the same actions as actions() """
+        for state in random_states(1, 20):
+            actions = list(state.iter_actions())
+            self.assertCountEqual(actions, state.actions())
+            if state.locs[state.player()] is not None:
+                self.assertTrue(all(isinstance(a, Action) for a in actions))
+
+
+class ZobristTest(unittest.TestCase):
+    def test_incremental_key_matches_full_key(self):
+        """ the key updated by result() equals the key computed from scratch """
+        for state in random_states(2, 20):
+            self.assertEqual(state.zobrist, _zobrist_key(state.board, state.ply_count, state.locs))
+            self.assertEqual(DebugState.from_state(state).zobrist, state.zobrist)
+
+    def test_no_collisions(self):
+        """ different states reached in random games have different keys """
+        seen = {}
+        for state in random_states(3, 50):
+            self.assertEqual(seen.setdefault(state.zobrist, state), state)
@@ -1,4 +1,5 @@
 
+import pickle
 import unittest
 
 from collections import deque
@@ -7,7 +8,7 @@ from textwrap import dedent
 
 from isolation import Isolation, Agent, fork_get_action, play, DebugState
 from sample_players import RandomPlayer
-from my_custom_player import CustomPlayer
+from my_custom_player import CustomPlayer, TranspositionTable, EXACT, LOWER
 
 
 class BaseCustomPlayerTest(unittest.TestCase):
@@ -67,3 +68,94 @@ class CustomPlayerPlayTest(BaseCustomPlayerTest):
                        
             raise Exception("Your agent did not play until a terminal state.")
 
+
+class TranspositionTableTest(unittest.TestCase):
+    def test_replacement(self):
+        """ deeper results keep the depth-preferred slot; others use the always-replace slot """
+        table = TranspositionTable(buckets=4)
+        table.store(1, 5, 3, EXACT, None)
+        table.store(5, 2, 1, LOWER, None)  # same bucket, shallower
+        table.store(9, 1, 0, EXACT, None)  # replaces key 5
+        self.assertEqual(table.lookup(1).depth, 5)
+        self.assertIsNone(table.lookup(5))
+        self.assertEqual(table.lookup(9).value, 0)
+        table.store(13, 6, 2, EXACT, None)  # deeper, takes the preferred slot
+        self.assertIsNone(table.lookup(1))
+        self.assertEqual((table.hits, table.misses), (2, 2))
+
+    def test_dump_load(self):
+        """ dump() keeps the deepest entries, and load() restores them """
+        table = TranspositionTable(buckets=64)
+        for key in range(40):
+            table.store(key, key % 8, -key / 2, key % 3, None if key % 5 else 13)
+        packed = pickle.loads(pickle.dumps(table.dump(10)))
+        self.assertEqual(sorted(packed[1]), [6] * 5 + [7] * 5)
+        restored = TranspositionTable(buckets=64)
+        restored.load(packed)
+        self.assertEqual(len(restored), 10)
+        for key in packed[0]:
+            self.assertEqual(restored.lookup(key), table.lookup(key))
+
+    def test_search_matches_minimax(self):
+        """ alpha-beta search with the table returns the minimax value at each depth """
+        def minimax(state, player_id, depth):
+            if state.terminal_test():
+                return state.utility(player_id)
+            if depth == 0:
+                return (state.count_liberties(state.locs[player_id])
+                        - state.count_liberties(state.locs[1 - player_id]))
+            values = [minimax(state.result(a), player_id, depth - 1) for a in state.actions()]
+            return max(values) if state.player() == player_id else min(values)
+
+        state = Isolation().result(57).result(20)
+        for _ in range(3):
+            state = state.result(state.actions()[0])
+        player = CustomPlayer(state.player())
+        player.table = TranspositionTable(buckets=1 << 10)
+        for depth in range(1, 5):
+            action = player.alpha_beta_search(state, depth)
+            expected = max(minimax(state.result(a), player.player_id, depth - 1) for a in state.actions())
+            self.assertEqual(player.table.lookup(state.zobrist).value, expected)
+            self.assertEqual(minimax(state.result(action), player.player_id, depth - 1), expected)
+
+
+class MoveOrderingTest(unittest.TestCase):
+    def test_ordered_actions(self):
+        """ the table move comes first, then the killer moves, then the rest by history score """
+        state = Isolation().result(57).result(20)
+        actions = state.actions()
+        player = CustomPlayer(state.player())
+        player.killers[3] = [actions[1], actions[0]]
+        player.history[(state.player(), actions[-1], state.locs[state.player()])] = 9
+        ordered = player._ordered_actions(state, actions[2], depth=3)
+        self.assertEqual(ordered[:4], [actions[2], actions[1], actions[0], actions[-1]])
+        self.assertCountEqual(ordered, actions)
+
+    def test_cutoffs_update_killers_and_history(self):
+        """ _record_cutoff() keeps the two latest killer moves of a ply """
+        state = Isolation().result(57).result(20)
+        a, b = state.actions()[:2]
+        player = CustomPlayer(state.player())
+        for action in (a, a, b):
+            player._record_cutoff(state, action, depth=2, draft=3)
+        self.assertEqual(player.killers[2], [b, a])
+        self.assertEqual(player.history[(state.player(), a, 57)], 18)
+
+
+class PrincipalVariationSearchTest(unittest.TestCase):
+    def test_search_value(self):
+        """ principal variation search and aspiration windows do not change the search value """
+        class PlainPlayer(CustomPlayer):
+            PRINCIPAL_VARIATION_SEARCH = False
+            ASPIRATION_WINDOW = None
+
+        state = Isolation().result(57).result(20)
+        for _ in range(4):
+            state = state.result(state.actions()[-1])
+        players = [cls(state.player()) for cls in (CustomPlayer, PlainPlayer)]
+        for player in players:
+            player.table = TranspositionTable(buckets=1 << 12)
+        for depth in range(1, 7):
+            for player in players:
+                player.alpha_beta_search(state, depth)
+            self.assertEqual(players[0].score, players[1].score)
@@ -0,0 +1,65 @@
+
+import unittest
+
+from multiprocessing import Pipe
+
+from isolation import StopSearch, TimedQueue
+from sample_players import BasePlayer
+
+
+class StubQueue:
+    """ Stand in for a TimedQueue with a clock set by the test """
+    def __init__(self, time_limit):
+        self.time_limit = time_limit
+        self.seconds_left = None  # timer not started
+
+    def time_left(self):
+        return self.seconds_left
+
+
+class ClockTest(unittest.TestCase):
+    def setUp(self):
+        self.player = BasePlayer(0)
+        self.queue = StubQueue(0.1)
+
+    def test_untimed(self):
+        """ a player without a timed queue never runs out of time """
+        self.assertEqual(self.player.time_left(), float("inf"))
+        self.assertEqual(self.player.time_used(), 0)
+        self.assertFalse(self.player.soft_deadline_passed())
+        self.assertTrue(self.player.should_deepen(10, 10))
+        self.player.check_time()
+
+    def test_deadlines(self):
+        """ the clock follows the timer of the queue """
+        self.player.queue = self.queue
+        self.assertEqual(self.player.time_left(), float("inf"))  # timer not started
+        self.queue.seconds_left = 0.1
+        self.assertEqual(self.player.time_left(), 0.1)
+        self.assertEqual(self.player.time_used(), 0)
+        self.assertFalse(self.player.soft_deadline_passed())
+        self.assertTrue(self.player.should_deepen(0.01, 2))
+        self.assertFalse(self.player.should_deepen(0.05, 2))  # expected to take 0.1s
+        self.player.check_time()
+
+        self.queue.seconds_left = 0.015
+        self.assertTrue(self.player.soft_deadline_passed())
+        self.assertFalse(self.player.should_deepen(0, 1))
+        self.player.check_time()
+
+        self.queue.seconds_left = 0
+        with self.assertRaises(StopSearch):
+            self.player.check_time()
+        self.queue.seconds_left = -0.01
+        with self.assertRaises(StopSearch):
+            self.player.check_time()
+
+    def test_timed_queue(self):
+        """ the clock reads the timer of a TimedQueue """
+        receiver, sender = Pipe()
+        self.player.queue = TimedQueue(receiver, sender, 10000)
+        self.assertEqual(self.player.time_left(), float("inf"))  # timer not started
+        self.player.queue.start_timer()
+        self.assertTrue(5 < self.player.time_left() <= 10)
+        self.assertFalse(self.player.soft_deadline_passed())
+        self.player.check_time()